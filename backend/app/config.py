@@ -1,13 +1,27 @@
-from pydantic_settings import BaseSettings
-from typing import List
+from functools import cached_property, lru_cache
+from pydantic import Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+from typing import Tuple
+import re
 
 
 class Settings(BaseSettings):
     """Application settings loaded from environment variables"""
     
+    model_config = SettingsConfigDict(
+        env_file=".env",
+        env_file_encoding="utf-8",
+        extra="ignore",
+        case_sensitive=False
+    )
+    
     # MongoDB
     mongodb_url: str = "mongodb://localhost:27017/healthease"
     mongodb_tls_insecure: bool = False  # Dev-only: allow invalid certs/hostnames
+    mongo_min_pool_size: int = 10
+    mongo_max_pool_size: int = 100
+    # Force index reconciliation on startup with MIGRATE=1 (see app.migrate_indexes)
+    sync_indexes: bool = Field(default=False, validation_alias="migrate")
     
     # JWT
     jwt_secret_key: str
@@ -45,15 +59,27 @@ class Settings(BaseSettings):
     demo_user_email: str = "demo@healthease.local"
     demo_user_password: str = "demo1234"
     
-    @property
-    def cors_origins_list(self) -> List[str]:
-        """Convert CORS origins string to list"""
-        return [origin.strip() for origin in self.cors_origins.split(",")]
+    @cached_property
+    def cors_origins_list(self) -> Tuple[str, ...]:
+        """Convert CORS origins string to a tuple (computed once)"""
+        return tuple(origin.strip() for origin in self.cors_origins.split(","))
+    
+    @cached_property
+    def cors_origin_regex(self) -> str:
+        """Single regex matching every configured CORS origin ('*' is a wildcard)"""
+        patterns = [
+            re.escape(origin).replace(r"\*", ".*")
+            for origin in self.cors_origins_list if origin
+        ]
+        return "^(?:" + "|".join(patterns) + ")$"
     
-    class Config:
-        env_file = ".env"
-        case_sensitive = False
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings, reading the environment only once"""
+    return Settings()
 
 
 # Global settings instance
-settings = Settings()
+settings = get_settings()
@@ -2,87 +2,364 @@
 MongoDB database connection and initialization module.
 Handles connection to MongoDB Atlas with automatic fallback mechanisms.
 """
+from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorClient
 from beanie import init_beanie
 from app.config import settings
+from app.utils.mongo_utils import resolve_srv_url, get_direct_connection_url
+from typing import List, Optional
+import asyncio
+import certifi
+import hashlib
+import importlib
+import json
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+# TLS client options, computed once (certifi.where() hits the filesystem)
+if settings.mongodb_tls_insecure:
+    _TLS_OPTIONS = {
+        "tls": True,
+        "tlsAllowInvalidCertificates": True,
+        "tlsAllowInvalidHostnames": True,
+    }
+else:
+    _TLS_OPTIONS = {"tls": True, "tlsCAFile": certifi.where()}
+
+
 class Database:
     """Database connection manager"""
     client: AsyncIOMotorClient = None
     connected: bool = False
+    # Set once the startup connection attempt has finished (success or not)
+    ready: asyncio.Event = asyncio.Event()
 
 
 db = Database()
 
 
-async def connect_to_mongo():
+# Beanie document models as "module:ClassName" paths, imported on demand
+DOCUMENT_MODEL_PATHS = (
+    "app.models.user:User",
+    "app.models.hospital:Hospital",
+    "app.models.patient:Patient",
+    "app.models.inventory:Inventory",
+    "app.models.surge_prediction:SurgePrediction",
+    "app.models.referral:Referral",
+    "app.models.wallet:Wallet",
+    "app.models.wallet:WalletTransaction",
+    "app.models.subscription:SubscriptionPlan",
+    "app.models.advertisement:Advertisement",
+    "app.models.capacity_log:CapacityLog",
+    "app.models.workflow_log:WorkflowLog",
+    "app.models.review:Review",
+    "app.models.notification:Notification",
+    "app.models.appointment:Appointment",
+    "app.models.medication:Medication",
+    "app.models.medication:MedicationReminder",
+    "app.models.medication:Prescription",
+    "app.models.analytics:Analytics",
+    "app.models.analytics:HealthAlert",
+    "app.models.analytics:PatientOutcome",
+    "app.models.telemedicine:IoTDevice",
+    "app.models.telemedicine:HealthData",
+    "app.models.telemedicine:HealthDataHourly",
+    "app.models.telemedicine:TelemedicineSession",
+    "app.models.telemedicine:EmergencyAlert",
+    "app.models.workflow:N8NWorkflow",
+    "app.models.workflow:WorkflowExecution",
+    "app.models.workflow:ExecutionLogEntry",
+    "app.models.workflow:WorkflowTemplate",
+    "app.models.workflow:AutomationRule",
+)
+
+
+def load_document_models() -> list:
+    """Import and return all Beanie document models"""
+    models = []
+    for path in DOCUMENT_MODEL_PATHS:
+        module_name, class_name = path.split(":")
+        module = importlib.import_module(module_name)
+        models.append(getattr(module, class_name))
+    return models
+
+
+# Document in the _meta collection holding the last applied index fingerprint
+INDEX_FINGERPRINT_ID = "index_fp"
+
+
+def compute_index_fingerprint(document_models: list) -> str:
+    """
+    Hash the index declarations of all models.
+    
+    Covers Settings.indexes, per-field index/unique flags and timeseries
+    options, so any index change in the models produces a different fingerprint.
+    """
+    declarations = []
+    for model in document_models:
+        indexes = getattr(getattr(model, "Settings", None), "indexes", [])
+        field_flags = {
+            name: field.json_schema_extra
+            for name, field in model.model_fields.items()
+            if isinstance(field.json_schema_extra, dict)
+        }
+        timeseries = getattr(getattr(model, "Settings", None), "timeseries", None)
+        declarations.append((model.__name__, indexes, field_flags, timeseries))
+    
+    # IndexModel objects are hashed by their index document
+    payload = json.dumps(
+        declarations,
+        sort_keys=True,
+        default=lambda o: getattr(o, "document", str(o))
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# Indexes that were superseded by other indexes in the model declarations.
+# Beanie runs with allow_index_dropping=False, so they are dropped here
+# whenever indexes are synced, before the declared indexes are created.
+OBSOLETE_INDEXES = {
+    # (hospital_id, timestamp) prefix covers hospital_id lookups, and the
+    # timeseries collection already indexes its time and meta fields
+    "capacity_logs": ("hospital_id_1", "timestamp_1"),
+    # Prefixes of compound indexes declared on the same collection
+    "analytics": (
+        "hospital_id_1", "period_start_1", "analytics_type_1", "region_1",
+        # Replaced by equality-first (analytics_type, period_start desc)
+        "period_start_1_analytics_type_1",
+    ),
+    "health_alerts": (
+        "status_1", "issued_at_1",
+        # Replaced by (status, severity, issued_at desc)
+        "status_1_severity_1", "issued_at_1_status_1",
+    ),
+    "patient_outcomes": ("patient_id_1", "hospital_id_1"),
+    "medications": ("patient_id_1",),
+    "medication_reminders": ("patient_id_1", "scheduled_time_1"),
+    # Non-unique index replaced by uq_prescription_number on the same key
+    "prescriptions": ("patient_id_1", "prescription_number_1"),
+    # Plain indexes replaced by TTL indexes on the same key; health_data is
+    # now a timeseries with collection-level expiry and compound indexes
+    "health_data": ("recorded_at_1", "ttl_recorded_at", "device_id_1", "patient_id_1"),
+    "emergency_alerts": (
+        "triggered_at_1", "patient_id_1", "status_1",
+        # Replaced by the partial active_alerts index
+        "status_1_severity_1", "status_1_severity_1_triggered_at_-1",
+    ),
+    # Covered by (wallet_id, created_at desc); recency listings use _id
+    "wallet_transactions": ("wallet_id_1", "created_at_1"),
+    # Covered by (workflow_id, status, started_at desc) and (status, started_at desc)
+    "workflow_executions": ("workflow_id_1", "status_1", "workflow_id_1_started_at_-1"),
+    "n8n_workflow_logs": ("workflow_name_1",),
+    # Covered by the (status, category) and (hospital_id, status) compounds
+    "n8n_workflows": ("status_1", "hospital_id_1"),
+    # Covered by (hospital_id, is_active) and (is_active, priority desc)
+    "automation_rules": ("hospital_id_1", "is_active_1"),
+    "iot_devices": ("patient_id_1", "device_type_1", "status_1"),
+    # Replaced by (id, status, scheduled_start) compounds
+    "telemedicine_sessions": (
+        "patient_id_1", "doctor_id_1", "hospital_id_1", "status_1",
+        "doctor_id_1_scheduled_start_1", "patient_id_1_scheduled_start_1",
+    ),
+}
+
+
+async def drop_obsolete_indexes(database) -> List[str]:
+    """
+    Drop the OBSOLETE_INDEXES that still exist
+    
+    Args:
+        database: Motor database
+    
+    Returns:
+        Names of the dropped indexes as "collection.index"
+    """
+    dropped = []
+    for collection_name, index_names in OBSOLETE_INDEXES.items():
+        collection = database[collection_name]
+        existing = await collection.index_information()
+        for index_name in index_names:
+            if index_name in existing:
+                await collection.drop_index(index_name)
+                dropped.append(f"{collection_name}.{index_name}")
+    if dropped:
+        logger.info(f"Dropped obsolete indexes: {', '.join(dropped)}")
+    return dropped
+
+
+async def sync_timeseries_expiry(database, document_models: list):
+    """
+    Apply timeseries expire_after_seconds to collections that already exist
+    
+    Beanie only sets the expiry when it creates a timeseries collection, so
+    existing collections are updated with collMod. A collection that is not
+    a timeseries yet (see app.migrate_health_data_timeseries) is skipped, as
+    the server rejects the option on regular collections.
+    
+    Args:
+        database: Motor database
+        document_models: Beanie document models
+    """
+    existing = set(await database.list_collection_names(filter={"type": "timeseries"}))
+    for model in document_models:
+        model_settings = getattr(model, "Settings", None)
+        timeseries = getattr(model_settings, "timeseries", None)
+        expire_after = getattr(timeseries, "expire_after_seconds", None)
+        name = getattr(model_settings, "name", None)
+        if expire_after is None or name not in existing:
+            continue
+        await database.command({"collMod": name, "expireAfterSeconds": expire_after})
+        logger.info(f"Set {name} expireAfterSeconds to {expire_after}")
+
+
+async def _open_client(url: str) -> AsyncIOMotorClient:
+    """Create a client for url and ping it, closing it again on failure"""
+    client = AsyncIOMotorClient(
+        url,
+        serverSelectionTimeoutMS=5000,
+        connectTimeoutMS=5000,
+        minPoolSize=settings.mongo_min_pool_size,
+        maxPoolSize=settings.mongo_max_pool_size,
+        maxIdleTimeMS=60000,
+        waitQueueTimeoutMS=5000,
+        **_TLS_OPTIONS
+    )
+    try:
+        # This also starts filling the pool up to minPoolSize during startup
+        # rather than on the first requests
+        await client.admin.command('ping')
+    except BaseException:
+        client.close()
+        raise
+    return client
+
+
+async def _connect_first_available(urls: List[str]) -> AsyncIOMotorClient:
+    """
+    Try all candidate URLs concurrently and keep the first that answers a ping.
+    
+    Worst-case latency is one server selection timeout rather than the sum
+    of all of them. Losing clients are closed.
+    """
+    tasks = [asyncio.create_task(_open_client(url)) for url in urls]
+    winner = None
+    error = None
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            try:
+                winner = await next_done
+                break
+            except Exception as e:
+                error = e
+    finally:
+        for task in tasks:
+            if not task.done():
+                task.cancel()
+            elif not task.cancelled() and task.exception() is None and task.result() is not winner:
+                task.result().close()
+    
+    if winner is None:
+        raise error
+    return winner
+
+
+async def connect_to_mongo(sync_indexes: Optional[bool] = None, skip_indexes: bool = False):
     """
     Connect to MongoDB and initialize Beanie ODM.
     Supports MongoDB Atlas with srv:// protocol.
+    
+    Index creation is skipped when the models' index fingerprint matches
+    the one stored by the last sync, so regular restarts don't pay for it.
+    Set sync_indexes (defaults to settings.sync_indexes) to force a sync.
+    
+    Data migrations that must run before the new indexes can be built pass
+    skip_indexes to leave indexes and the stored fingerprint untouched.
     """
+    if sync_indexes is None:
+        sync_indexes = settings.sync_indexes
     
-    # Import all models for Beanie registration
-    from app.models.user import User
-    from app.models.hospital import Hospital
-    from app.models.patient import Patient
-    from app.models.inventory import Inventory
-    from app.models.surge_prediction import SurgePrediction
-    from app.models.referral import Referral
-    from app.models.wallet import Wallet, WalletTransaction
-    from app.models.subscription import SubscriptionPlan
-    from app.models.advertisement import Advertisement
-    from app.models.capacity_log import CapacityLog
-    from app.models.workflow_log import WorkflowLog
-    from app.models.review import Review
-    from app.models.notification import Notification
-    from app.models.appointment import Appointment
-    from app.models.medication import Medication, MedicationReminder, Prescription
-    from app.models.analytics import Analytics, HealthAlert, PatientOutcome
-    from app.models.telemedicine import IoTDevice, HealthData, TelemedicineSession, EmergencyAlert
-    from app.models.workflow import N8NWorkflow, WorkflowExecution, WorkflowTemplate, AutomationRule
-
-    document_models = [
-        User, Hospital, Patient, Inventory, SurgePrediction, Referral,
-        Wallet, WalletTransaction, SubscriptionPlan, Advertisement,
-        CapacityLog, WorkflowLog, Review, Notification, Appointment,
-        Medication, MedicationReminder, Prescription, Analytics,
-        HealthAlert, PatientOutcome, IoTDevice, HealthData, TelemedicineSession,
-        EmergencyAlert, N8NWorkflow, WorkflowExecution, WorkflowTemplate, AutomationRule
-    ]
+    # Resolve models off the event loop while the client is being set up
+    models_task = asyncio.create_task(asyncio.to_thread(load_document_models))
 
     try:
         logger.info(f"Connecting to MongoDB...")
         
-        # Create MongoDB client with SSL/TLS disabled
-        db.client = AsyncIOMotorClient(
-            settings.mongodb_url,
-            serverSelectionTimeoutMS=10000,
-            connectTimeoutMS=10000,
-            tls=True,
-            tlsAllowInvalidCertificates=True,
-            tlsAllowInvalidHostnames=True
-        )
+        # Resolve SRV records asynchronously instead of inside the driver
+        candidates = [await resolve_srv_url(settings.mongodb_url)]
+        
+        # Atlas clusters can also be reached through the direct shard hosts
+        if settings.mongodb_url.startswith("mongodb+srv://"):
+            direct_url = get_direct_connection_url(settings.mongodb_url)
+            if direct_url:
+                candidates.append(direct_url)
+        
+        db.client = await _connect_first_available(candidates)
+        
+        database = db.client.get_default_database()
+        document_models = await models_task
+        
+        # Reconcile indexes only if forced or the declarations changed
+        fingerprint = compute_index_fingerprint(document_models)
+        if skip_indexes:
+            sync_indexes = False
+        elif not sync_indexes:
+            stored = await database["_meta"].find_one({"_id": INDEX_FINGERPRINT_ID})
+            sync_indexes = stored is None or stored.get("value") != fingerprint
+            if sync_indexes:
+                logger.info("Index declarations changed, syncing indexes")
+        
+        # Drop superseded indexes first, as a replacement may reuse their key
+        if sync_indexes:
+            await drop_obsolete_indexes(database)
         
         # Initialize Beanie with all document models
         await init_beanie(
-            database=db.client.get_default_database(),
-            document_models=document_models
+            database=database,
+            document_models=document_models,
+            allow_index_dropping=False,
+            skip_indexes=not sync_indexes
         )
         
-        # Test the connection
-        await db.client.admin.command('ping')
+        if sync_indexes:
+            await sync_timeseries_expiry(database, document_models)
+            await database["_meta"].update_one(
+                {"_id": INDEX_FINGERPRINT_ID},
+                {"$set": {"value": fingerprint}},
+                upsert=True
+            )
         
         db.connected = True
         logger.info("✓ Successfully connected to MongoDB and initialized Beanie")
         
     except Exception as e:
+        if not models_task.done():
+            models_task.cancel()
         logger.error(f"✗ MongoDB connection failed: {e}")
         db.connected = False
         logger.warning("⚠ Application starting in DEGRADED MODE (Database unavailable)")
+    
+    finally:
+        db.ready.set()
+
+
+async def require_db():
+    """
+    Dependency that waits for the startup connection attempt to finish
+    
+    Raises:
+        HTTPException: If the database is still connecting after 10 seconds
+    """
+    if db.ready.is_set():
+        return
+    try:
+        await asyncio.wait_for(db.ready.wait(), timeout=10)
+    except asyncio.TimeoutError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database is still connecting. Please try again shortly."
+        )
 
 
 async def close_mongo_connection():
@@ -1,125 +1,202 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Depends, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from contextlib import asynccontextmanager
 from app.config import settings
-from app.database import connect_to_mongo, close_mongo_connection, db
-from app.routes import auth, hospital, patient, admin
+from app.database import connect_to_mongo, close_mongo_connection, db, require_db
+from app.middleware.clock import RequestClockMiddleware
+from app.utils.responses import etag_response
+import asyncio
+import hashlib
+import importlib
 import logging
-
-# Configure logging
+import logging.handlers
+import orjson
+import queue
+
+# Configure logging: handlers only enqueue records, and a background
+# thread does the actual stream I/O off the event loop
+_log_queue = queue.SimpleQueue()
+_log_stream_handler = logging.StreamHandler()
+_log_stream_handler.setFormatter(
+    logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+)
 logging.basicConfig(
     level=logging.INFO if settings.debug else logging.WARNING,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    handlers=[logging.handlers.QueueHandler(_log_queue)]
 )
+_log_listener = logging.handlers.QueueListener(
+    _log_queue, _log_stream_handler, respect_handler_level=True
+)
+_log_listener.start()
 logger = logging.getLogger(__name__)
 
+
+async def _connect_in_background():
+    """Connect to MongoDB without blocking the server from accepting requests"""
+    try:
+        await connect_to_mongo()
+        if db.connected:
+            logger.info("Application startup complete (DB connected)")
+        else:
+            logger.warning("Application startup complete (DB unavailable, degraded mode)")
+    except Exception as e:
+        # Should not happen due to degraded mode, but be safe
+        logger.error(f"Startup DB error: {e}")
+        db.ready.set()
+
+
+# Route modules and the prefix each router is mounted under. They are imported
+# in the lifespan handler so importing app.main stays cheap.
+_ROUTE_MODULES = (
+    ("app.routes.auth", "/api"),
+    ("app.routes.hospital", "/api"),
+    ("app.routes.patient", "/api"),
+    ("app.routes.admin", "/api"),
+    ("app.routes.surge", "/api"),
+    ("app.routes.capacity", "/api"),
+    ("app.routes.referrals", "/api"),
+    ("app.routes.search", "/api"),
+    ("app.routes.wallet", "/api"),
+    ("app.routes.alerts", "/api"),
+    ("app.routes.advertisements", "/api"),
+    ("app.routes.inventory", "/api"),
+    ("app.routes.reviews", "/api"),
+    ("app.routes.chat", "/api"),
+    ("app.routes.notifications", "/api"),
+    ("app.routes.appointments", "/api"),
+    ("app.routes.medications", "/api"),
+    ("app.routes.analytics", "/api"),
+    ("app.routes.telemedicine", "/api"),
+    ("app.routes.workflows", "/api"),
+    ("app.routes.location", ""),
+)
+
+# API routes wait for the startup DB connection attempt
+_API_DEPENDENCIES = [Depends(require_db)]
+
+
+def include_routers(app: FastAPI):
+    """Import all route modules and mount their routers (idempotent)"""
+    if getattr(app.state, "routers_included", False):
+        return
+    for module_name, prefix in _ROUTE_MODULES:
+        module = importlib.import_module(module_name)
+        app.include_router(module.router, prefix=prefix, dependencies=_API_DEPENDENCIES)
+    app.state.routers_included = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Mount routers, start the DB connection, and close it on shutdown"""
+    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
+    include_routers(app)
+    connect_task = asyncio.create_task(_connect_in_background())
+    
+    yield
+    
+    logger.info("Shutting down application...")
+    if not connect_task.done():
+        connect_task.cancel()
+    
+    # Write out buffered counters and logs before the connection goes away
+    from app.services.increment_buffer import ad_metrics_buffer
+    from app.services.insert_buffer import capacity_log_buffer, execution_log_buffer
+    await ad_metrics_buffer.stop()
+    await capacity_log_buffer.stop()
+    await execution_log_buffer.stop()
+    
+    await close_mongo_connection()
+    logger.info("Application shutdown complete")
+    _log_listener.stop()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Agentic AI Hospital Management & Patient Flow Platform",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
-# Configure CORS
+# Configure CORS; configured origins are matched with one compiled regex
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origin_regex=settings.cors_origin_regex,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
+# Document timestamps created during a request share one "now"
+app.add_middleware(RequestClockMiddleware)
 
-# Startup event
-@app.on_event("startup")
-async def startup_event():
-    """Initialize database connection on startup"""
-    logger.info(f"Starting {settings.app_name} v{settings.app_version}")
-    try:
-        await connect_to_mongo()
-        if db.connected:
-            logger.info("Application startup complete (DB connected)")
-        else:
-            logger.warning("Application startup complete (DB unavailable, degraded mode)")
-    except Exception as e:
-        # Should not happen due to degraded mode, but be safe
-        logger.error(f"Startup DB error: {e}")
-        
 
+# Health check responses are probed constantly, so their bodies and ETags are
+# built once here; a proxy may serve them for up to a second
+_HEALTH_CACHE_CONTROL = "public, max-age=1"
 
-# Shutdown event
-@app.on_event("shutdown")
-async def shutdown_event():
-    """Close database connection on shutdown"""
-    logger.info("Shutting down application...")
-    await close_mongo_connection()
-    logger.info("Application shutdown complete")
+
+def _prebuilt_json(payload: dict) -> tuple:
+    """Encode a static JSON payload once and return (body, etag)"""
+    body = orjson.dumps(payload)
+    return body, '"' + hashlib.md5(body).hexdigest() + '"'
+
+
+def _prebuilt_response(request: Request, prebuilt: tuple) -> Response:
+    """Return a prebuilt body, or 304 if the client already has it"""
+    body, etag = prebuilt
+    return etag_response(request, body, etag, _HEALTH_CACHE_CONTROL)
+
+
+_ROOT_RESPONSE = _prebuilt_json({
+    "message": f"Welcome to {settings.app_name} API",
+    "version": settings.app_version,
+    "status": "healthy"
+})
+
+_HEALTH_RESPONSES = {
+    database: _prebuilt_json({
+        "status": "healthy",
+        "service": settings.app_name,
+        "version": settings.app_version,
+        "database": database,
+    })
+    for database in ("connected", "unavailable", "connecting")
+}
 
 
 # Health check endpoint
 @app.get("/", tags=["Health"])
-async def root():
+async def root(request: Request):
     """Root endpoint - health check"""
-    return {
-        "message": f"Welcome to {settings.app_name} API",
-        "version": settings.app_version,
-        "status": "healthy"
-    }
+    return _prebuilt_response(request, _ROOT_RESPONSE)
 
 
 @app.get("/health", tags=["Health"])
-async def health_check():
+async def health_check(request: Request):
     """Health check endpoint"""
-    status = {
-        "status": "healthy",
-        "service": settings.app_name,
-        "version": settings.app_version,
-        "database": "connected" if db.connected else "unavailable",
-    }
-    return status
+    if db.connected:
+        database = "connected"
+    else:
+        database = "unavailable" if db.ready.is_set() else "connecting"
+    return _prebuilt_response(request, _HEALTH_RESPONSES[database])
 
 
 @app.get("/api/health", tags=["Health"])
-async def api_health_check():
+async def api_health_check(request: Request):
     """Health check endpoint under /api prefix"""
-    return await health_check()
-
-
-# Include routers
-app.include_router(auth.router, prefix="/api")
-app.include_router(hospital.router, prefix="/api")
-app.include_router(patient.router, prefix="/api")
-app.include_router(admin.router, prefix="/api")
-
-# Import and include new routers
-from app.routes import surge, capacity, referrals, search, wallet, alerts, advertisements, inventory, reviews, chat, notifications, appointments, medications, analytics, telemedicine, workflows, location
-app.include_router(surge.router, prefix="/api")
-app.include_router(capacity.router, prefix="/api")
-app.include_router(referrals.router, prefix="/api")
-app.include_router(search.router, prefix="/api")
-app.include_router(wallet.router, prefix="/api")
-app.include_router(alerts.router, prefix="/api")
-app.include_router(advertisements.router, prefix="/api")
-app.include_router(inventory.router, prefix="/api")
-app.include_router(reviews.router, prefix="/api")
-app.include_router(chat.router, prefix="/api")
-app.include_router(notifications.router, prefix="/api")
-app.include_router(appointments.router, prefix="/api")
-app.include_router(medications.router, prefix="/api")
-app.include_router(analytics.router, prefix="/api")
-app.include_router(telemedicine.router, prefix="/api")
-app.include_router(workflows.router, prefix="/api")
-app.include_router(location.router)
+    return await health_check(request)
 
 
 # Error handlers
-from fastapi.responses import JSONResponse
-
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
     """Custom 404 handler"""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Not Found",
@@ -133,7 +210,7 @@ async def not_found_handler(request, exc):
 async def internal_error_handler(request, exc):
     """Custom 500 handler"""
     logger.error(f"Internal server error: {exc}")
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal Server Error",
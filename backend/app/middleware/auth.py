@@ -1,31 +1,96 @@
 from fastapi import HTTPException, status, Depends
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from app.utils.jwt import decode_access_token
-from app.models.user import User, UserRole
-from typing import Optional, List
+from app.utils.jwt import decode_access_token, is_demo_token, DEMO_TOKEN_PREFIX, DEMO_USER_ID
+from app.config import settings
+from app.models.user import User, UserRole, AuthUserView
+from app.database import db
+from typing import Optional, Tuple
+from functools import lru_cache
 from bson import ObjectId
+from cachetools import TTLCache
+import asyncio
 
 
 # HTTP Bearer token scheme
 security = HTTPBearer()
 
+# Short-lived cache of authenticated users so hot endpoints skip the DB lookup
+_USER_CACHE: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+# Per-user locks so concurrent cache misses share a single DB fetch
+_USER_LOCKS: TTLCache = TTLCache(maxsize=10_000, ttl=60)
+
+# Synthetic user returned for demo-mode tokens, built once
+_DEMO_USER = AuthUserView.model_construct(
+    id=DEMO_USER_ID,
+    email=settings.demo_user_email,
+    role=UserRole.PATIENT,
+    is_active=True
+)
+
+
+def invalidate_user(user_id) -> None:
+    """
+    Drop a user from the authentication cache
+    
+    Call this after changing a user's role, active flag or profile links.
+    
+    Args:
+        user_id: User ID (str or ObjectId)
+    """
+    _USER_CACHE.pop(str(user_id), None)
+
+
+async def _load_user(user_id: str) -> Optional[AuthUserView]:
+    """Fetch a user through the cache, coalescing concurrent misses"""
+    user = _USER_CACHE.get(user_id)
+    if user is not None:
+        return user
+    
+    lock = _USER_LOCKS.setdefault(user_id, asyncio.Lock())
+    async with lock:
+        # Another request may have filled the cache while we waited
+        user = _USER_CACHE.get(user_id)
+        if user is None:
+            user = await User.find_one(
+                {"_id": ObjectId(user_id)},
+                projection_model=AuthUserView
+            )
+            if user is not None:
+                _USER_CACHE[user_id] = user
+    return user
+
 
 async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security)
-) -> User:
+) -> AuthUserView:
     """
     Get current authenticated user from JWT token
     
+    Only the fields in AuthUserView are loaded; fetch the User document
+    separately if an endpoint needs anything else.
+    
     Args:
         credentials: HTTP Bearer credentials
         
     Returns:
-        User object
+        AuthUserView with the user's id, email, role and profile links
         
     Raises:
         HTTPException: If token is invalid or user not found
     """
     token = credentials.credentials
+    
+    # Demo tokens are checked without a JWT decode or DB lookup
+    if settings.demo_auth_enabled and token.startswith(DEMO_TOKEN_PREFIX):
+        if is_demo_token(token):
+            return _DEMO_USER
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid authentication credentials",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    
     payload = decode_access_token(token)
     
     if payload is None:
@@ -43,28 +108,22 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Demo auth fallback: return synthetic user object for demo-user-id
-    if user_id == "demo-user-id":
-        # Create a mock User object with demo credentials
-        from app.config import settings
-        demo_user = User(
-            email=settings.demo_user_email,
-            password_hash="",  # Not used for demo
-            role=UserRole.PATIENT,
-            is_active=True
-        )
-        demo_user.id = user_id  # Set the ID directly
-        return demo_user
-    
-    # Fetch user from database
-    try:
-        user = await User.get(ObjectId(user_id))
-    except Exception:
+    # Reject malformed IDs up front instead of relying on ObjectId() raising
+    if not ObjectId.is_valid(user_id):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="User not found"
         )
     
+    if not db.connected:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database unavailable. Please try again later."
+        )
+    
+    # Fetch user from database (ObjectId is only built on a cache miss)
+    user = await _load_user(user_id)
+    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -80,21 +139,29 @@ async def get_current_user(
     return user
 
 
-def require_role(allowed_roles: List[UserRole]):
+@lru_cache(maxsize=32)
+def require_role(allowed_roles: Tuple[UserRole, ...]):
     """
     Dependency to check if user has required role
     
+    Memoized so identical role tuples share one dependency object, which
+    FastAPI then resolves once per request.
+    
     Args:
-        allowed_roles: List of allowed user roles
+        allowed_roles: Tuple of allowed user roles (UserRole or role values)
         
     Returns:
         Dependency function
     """
-    async def role_checker(current_user: User = Depends(get_current_user)) -> User:
-        if current_user.role not in allowed_roles:
+    # Normalize to UserRole: str-Enum members hash by name, not by value
+    allowed = frozenset(UserRole(role) for role in allowed_roles)
+    denied_detail = f"Access denied. Required roles: {[UserRole(role).value for role in allowed_roles]}"
+    
+    async def role_checker(current_user: AuthUserView = Depends(get_current_user)) -> AuthUserView:
+        if current_user.role not in allowed:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN,
-                detail=f"Access denied. Required roles: {[role.value for role in allowed_roles]}"
+                detail=denied_detail
             )
         return current_user
     
@@ -102,16 +169,46 @@ def require_role(allowed_roles: List[UserRole]):
 
 
 # Convenience dependencies for specific roles
-async def get_patient_user(current_user: User = Depends(require_role([UserRole.PATIENT]))) -> User:
+async def get_patient_user(current_user: AuthUserView = Depends(require_role((UserRole.PATIENT,)))) -> AuthUserView:
     """Dependency to get current patient user"""
     return current_user
 
 
-async def get_hospital_user(current_user: User = Depends(require_role([UserRole.HOSPITAL]))) -> User:
+async def get_hospital_user(current_user: AuthUserView = Depends(require_role((UserRole.HOSPITAL,)))) -> AuthUserView:
     """Dependency to get current hospital user"""
     return current_user
 
 
-async def get_admin_user(current_user: User = Depends(require_role([UserRole.ADMIN]))) -> User:
+async def get_admin_user(current_user: AuthUserView = Depends(require_role((UserRole.ADMIN,)))) -> AuthUserView:
     """Dependency to get current admin user"""
     return current_user
+
+
+def user_hospital_id(user: AuthUserView) -> ObjectId:
+    """
+    Hospital a hospital-role user acts for, as an ObjectId
+    
+    User.hospital_id is stored as a string, so it must be converted before
+    comparing it with ObjectId references. Users without a linked hospital
+    act under their own id.
+    
+    Args:
+        user: Authenticated user
+    
+    Returns:
+        The linked hospital's id, or the user's id
+    """
+    return ObjectId(user.hospital_id) if user.hospital_id else user.id
+
+
+def user_profile_id(user: AuthUserView) -> Optional[ObjectId]:
+    """
+    Patient profile of a patient-role user, as an ObjectId
+    
+    Args:
+        user: Authenticated user
+    
+    Returns:
+        The profile id, or None if the user has no profile
+    """
+    return ObjectId(user.profile_id) if user.profile_id else None
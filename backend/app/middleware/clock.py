@@ -0,0 +1,29 @@
+from app.utils.clock import freeze_now, unfreeze_now
+
+
+class RequestClockMiddleware:
+    """
+    ASGI middleware that freezes app.utils.clock.utcnow() per HTTP request.
+
+    The timestamp is released once the response body is complete, so
+    background tasks that run after the response read the live clock.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                unfreeze_now()
+            await send(message)
+
+        freeze_now()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            unfreeze_now()
@@ -0,0 +1,67 @@
+"""
+Convert [lat, lng] coordinate lists to GeoJSON Points.
+
+IoTDevice and EmergencyAlert coordinates are now GeoJSON Points with a
+2dsphere index. Legacy [lat, lng] pairs would be read as [lng, lat] by the
+index, and any longitude above 90 makes the index build fail, so app startup
+fails to sync indexes until they are converted. Run this before starting the
+new version of the app:
+
+    python -m app.migrate_geo_points
+
+The script connects without syncing indexes and forces a sync once the
+coordinates are converted.
+"""
+import asyncio
+import logging
+import sys
+
+from app.database import connect_to_mongo, close_mongo_connection, db
+from app.migrate_indexes import migrate_indexes
+
+logger = logging.getLogger(__name__)
+
+# Collections whose "coordinates" field used to be a [lat, lng] list
+GEO_POINT_COLLECTIONS = ("iot_devices", "emergency_alerts")
+
+
+async def migrate_geo_points() -> bool:
+    """Convert legacy coordinate lists in place and report whether it succeeded"""
+    await connect_to_mongo(skip_indexes=True)
+    try:
+        if not db.connected:
+            return False
+        database = db.client.get_default_database()
+        for collection_name in GEO_POINT_COLLECTIONS:
+            result = await database[collection_name].update_many(
+                {"coordinates": {"$type": "array"}},
+                [{"$set": {"coordinates": {
+                    "type": "Point",
+                    "coordinates": [
+                        {"$arrayElemAt": ["$coordinates", 1]},
+                        {"$arrayElemAt": ["$coordinates", 0]}
+                    ]
+                }}}]
+            )
+            logger.info(f"{collection_name}: converted {result.modified_count} documents")
+    finally:
+        await close_mongo_connection()
+
+    # Every point is GeoJSON now, so the 2dsphere indexes can be built
+    return await migrate_indexes()
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if asyncio.run(migrate_geo_points()):
+        logger.info("GeoJSON migration complete")
+        return 0
+    logger.error("GeoJSON migration failed (database unavailable)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
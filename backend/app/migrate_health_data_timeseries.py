@@ -0,0 +1,103 @@
+"""
+Convert the health_data collection into a timeseries collection.
+
+MongoDB can't turn an existing collection into a timeseries, and Beanie only
+creates one when the collection doesn't exist yet. Run this once before
+starting the app on a database that still has plain health_data documents:
+
+    python -m app.migrate_health_data_timeseries
+
+The old collection is renamed to health_data_legacy and its documents are
+copied into the new timeseries collection, with per-sample vital_signs
+lists converted to column-wise blocks and patient_id to an ObjectId. The
+script connects without syncing indexes and forces a sync once the new
+collection exists, so its indexes are built there rather than on the
+legacy collection.
+
+Drop the legacy collection once the copy has been checked. Documents older
+than the retention window are removed by the server shortly after they are
+copied.
+"""
+import asyncio
+import logging
+import sys
+
+from bson import ObjectId
+
+from app.database import connect_to_mongo, close_mongo_connection, db
+from app.migrate_indexes import migrate_indexes
+from app.models.telemedicine import HealthData, VitalSign, VitalBlock
+
+logger = logging.getLogger(__name__)
+
+LEGACY_COLLECTION = "health_data_legacy"
+BATCH_SIZE = 1000
+
+
+def _convert(document: dict) -> dict:
+    """Bring a legacy document up to the current HealthData layout"""
+    patient_id = document.get("patient_id")
+    if isinstance(patient_id, str) and ObjectId.is_valid(patient_id):
+        document["patient_id"] = ObjectId(patient_id)
+    vital_signs = document.pop("vital_signs", None)
+    if vital_signs is not None and "blocks" not in document:
+        document["blocks"] = [
+            block.model_dump()
+            for block in VitalBlock.from_vital_signs([VitalSign.model_validate(v) for v in vital_signs])
+        ]
+    return document
+
+
+async def migrate_health_data_timeseries() -> bool:
+    """Move health_data into a timeseries collection and report whether it succeeded"""
+    await connect_to_mongo(skip_indexes=True)
+    try:
+        if not db.connected:
+            return False
+        database = db.client.get_default_database()
+        name = HealthData.Settings.name
+
+        info = await database.list_collections(filter={"name": name}).to_list(length=1)
+        if info and info[0].get("type") == "timeseries":
+            logger.info(f"{name} is already a timeseries collection")
+        else:
+            if info:
+                await database[name].rename(LEGACY_COLLECTION)
+            await database.create_collection(**HealthData.Settings.timeseries.build_query(name))
+            logger.info(f"Created timeseries collection {name}")
+
+            if info:
+                target = database[name]
+                copied = 0
+                batch = []
+                async for document in database[LEGACY_COLLECTION].find({}):
+                    batch.append(_convert(document))
+                    if len(batch) >= BATCH_SIZE:
+                        await target.insert_many(batch, ordered=False)
+                        copied += len(batch)
+                        batch = []
+                if batch:
+                    await target.insert_many(batch, ordered=False)
+                    copied += len(batch)
+                logger.info(f"Copied {copied} documents into timeseries collection {name}")
+    finally:
+        await close_mongo_connection()
+
+    # Build the HealthData indexes on the new collection; an earlier sync
+    # may have built them on the legacy one and stored a matching fingerprint
+    return await migrate_indexes()
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if asyncio.run(migrate_health_data_timeseries()):
+        return 0
+    logger.error("health_data timeseries migration failed (database unavailable)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
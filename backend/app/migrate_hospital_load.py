@@ -0,0 +1,63 @@
+"""
+Backfill the denormalized Hospital.load_probability and occupancy_avg fields.
+
+New writes keep them current through Hospital.refresh_load; run this once for
+hospitals saved before the fields existed. It is idempotent:
+
+    python -m app.migrate_hospital_load
+"""
+import asyncio
+import logging
+import sys
+
+from pymongo import UpdateOne
+
+from app.database import connect_to_mongo, close_mongo_connection, db
+from app.models.hospital import Hospital
+from app.models.hospital_math import capacity_matrix, occupancy_batch, load_probability_batch
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_hospital_load() -> bool:
+    """Recompute load fields for all hospitals and report whether it succeeded"""
+    await connect_to_mongo()
+    try:
+        if not db.connected:
+            return False
+        collection = Hospital.get_motor_collection()
+        docs = await collection.find({}, {"capacity": 1}).to_list(length=None)
+        if not docs:
+            return True
+
+        beds, icu, ventilators = occupancy_batch(capacity_matrix(d.get("capacity") or {} for d in docs))
+        averages = ((beds + icu + ventilators) / 3).round(2).tolist()
+        labels = load_probability_batch(beds, icu, ventilators)
+
+        operations = [
+            UpdateOne(
+                {"_id": doc["_id"]},
+                {"$set": {"occupancy_avg": average, "load_probability": label}}
+            )
+            for doc, average, label in zip(docs, averages, labels)
+        ]
+        result = await collection.bulk_write(operations, ordered=False)
+        logger.info(f"Updated load fields on {result.modified_count} of {len(docs)} hospitals")
+        return True
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if asyncio.run(migrate_hospital_load()):
+        return 0
+    logger.error("Hospital load backfill failed (database unavailable)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
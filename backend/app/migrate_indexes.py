@@ -0,0 +1,43 @@
+"""
+Create and reconcile MongoDB indexes for all Beanie document models, and
+drop indexes listed in app.database.OBSOLETE_INDEXES.
+
+Application startup already syncs indexes whenever the models' index
+fingerprint changes, so routine deploys don't need this. It forces a sync
+regardless of the stored fingerprint, e.g. after indexes were changed by
+hand or as an explicit deploy step:
+
+    python -m app.migrate_indexes
+"""
+import asyncio
+import logging
+import sys
+
+from app.database import connect_to_mongo, close_mongo_connection, db
+
+logger = logging.getLogger(__name__)
+
+
+async def migrate_indexes() -> bool:
+    """Connect with index syncing enabled and report whether it succeeded"""
+    await connect_to_mongo(sync_indexes=True)
+    try:
+        return db.connected
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if asyncio.run(migrate_indexes()):
+        logger.info("Indexes are up to date")
+        return 0
+    logger.error("Index migration failed (database unavailable)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Convert document references stored as hex strings to BSON ObjectIds.
+
+Run once after deploying models that declare these fields as ObjectId:
+
+    python -m app.migrate_object_ids
+
+Values that are not valid ObjectId strings are left unchanged.
+"""
+import asyncio
+import logging
+import sys
+
+from app.database import connect_to_mongo, close_mongo_connection, db
+
+logger = logging.getLogger(__name__)
+
+# Collection name -> reference fields that used to be stored as strings
+OBJECT_ID_FIELDS = {
+    "analytics": ("hospital_id", "patient_id"),
+    "medications": ("patient_id", "hospital_id", "prescribed_by"),
+    "medication_reminders": ("patient_id",),
+    "prescriptions": ("patient_id", "hospital_id", "doctor_id"),
+    "iot_devices": ("patient_id", "hospital_id"),
+    "health_data_hourly": ("patient_id",),
+    "telemedicine_sessions": ("appointment_id", "patient_id", "doctor_id", "hospital_id"),
+    "emergency_alerts": ("patient_id",),
+    # Updating measurement fields of a timeseries collection needs MongoDB
+    # 7.0; migrate_health_data_timeseries converts patient_id while copying
+    "health_data": ("patient_id",),
+}
+
+
+async def migrate_object_ids() -> bool:
+    """Convert string references in place and report whether it succeeded"""
+    await connect_to_mongo()
+    try:
+        if not db.connected:
+            return False
+        database = db.client.get_default_database()
+        for collection_name, fields in OBJECT_ID_FIELDS.items():
+            for field in fields:
+                result = await database[collection_name].update_many(
+                    {field: {"$type": "string"}},
+                    [{"$set": {field: {"$convert": {
+                        "input": f"${field}",
+                        "to": "objectId",
+                        "onError": f"${field}"
+                    }}}}]
+                )
+                logger.info(f"{collection_name}.{field}: converted {result.modified_count} documents")
+        return True
+    finally:
+        await close_mongo_connection()
+
+
+def main() -> int:
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
+    if asyncio.run(migrate_object_ids()):
+        logger.info("ObjectId migration complete")
+        return 0
+    logger.error("ObjectId migration failed (database unavailable)")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
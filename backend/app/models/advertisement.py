@@ -1,9 +1,12 @@
-from beanie import Document
-from pydantic import Field
+from beanie import Document, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from pydantic import Field, BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
+from pymongo import ReturnDocument
 from enum import Enum
+from app.utils.clock import utcnow
+from app.services.response_cache import response_cache
 
 
 class AdStatus(str, Enum):
@@ -13,8 +16,9 @@ class AdStatus(str, Enum):
     REJECTED = "rejected"
 
 
-class AdvertisementMetrics(dict):
+class AdvertisementMetrics(BaseModel):
     """Embedded document for ad metrics"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     impressions_count: int = 0
     clicks_count: int = 0
 
@@ -35,7 +39,7 @@ class Advertisement(Document):
         "impressions_count": 0,
         "clicks_count": 0
     })
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     updated_at: Optional[datetime] = None
     
     class Settings:
@@ -46,15 +50,47 @@ class Advertisement(Document):
             [("hospital_id", 1), ("is_active", 1)]
         ]
     
-    async def increment_impressions(self):
-        """Increment impression count"""
-        self.metrics["impressions_count"] += 1
-        await self.save()
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_cache(self):
+        """Drop the cached admin advertisement listing after a write"""
+        response_cache.invalidate("admin_advertisements")
     
-    async def increment_clicks(self):
-        """Increment click count"""
-        self.metrics["clicks_count"] += 1
-        await self.save()
+    async def _increment_metric(self, key: str, return_new: bool) -> Optional[int]:
+        """
+        Atomically increment metrics.<key> in a single round-trip
+        
+        Args:
+            key: Metric name, e.g. "impressions_count"
+            return_new: Fetch and return the post-increment value
+            
+        Returns:
+            New count if return_new, otherwise None
+        """
+        collection = Advertisement.get_motor_collection()
+        field = f"metrics.{key}"
+        
+        if return_new:
+            doc = await collection.find_one_and_update(
+                {"_id": self.id},
+                {"$inc": {field: 1}},
+                projection={field: 1},
+                return_document=ReturnDocument.AFTER
+            )
+            new_count = doc["metrics"][key] if doc else None
+        else:
+            await collection.update_one({"_id": self.id}, {"$inc": {field: 1}})
+            new_count = None
+        
+        self.metrics[key] = new_count if new_count is not None else self.metrics.get(key, 0) + 1
+        return new_count
+    
+    async def increment_impressions(self, return_new: bool = False) -> Optional[int]:
+        """Increment impression count (atomic $inc, no full-document save)"""
+        return await self._increment_metric("impressions_count", return_new)
+    
+    async def increment_clicks(self, return_new: bool = False) -> Optional[int]:
+        """Increment click count (atomic $inc, no full-document save)"""
+        return await self._increment_metric("clicks_count", return_new)
     
     def get_ctr(self) -> float:
         """Calculate click-through rate"""
@@ -1,8 +1,11 @@
 from typing import List, Optional
 from beanie import Document
-from pydantic import BaseModel, Field
+from beanie import PydanticObjectId as ObjectId
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
+from app.models.delimited import DelimitedList, DELIMITED_BSON_ENCODERS
 from enum import Enum
+from app.utils.clock import utcnow
 
 class AnalyticsType(str, Enum):
     PATIENT_FLOW = "patient_flow"
@@ -36,19 +39,33 @@ class PredictiveInsight(BaseModel):
     type: str  # "admission_risk", "readmission_risk", "epidemic_outbreak"
     probability: float  # 0.0 to 1.0
     confidence_level: float  # 0.0 to 1.0
-    factors: List[str] = []
-    recommended_actions: List[str] = []
+    factors: DelimitedList = []
+    recommended_actions: DelimitedList = []
     time_horizon: str  # "24h", "7d", "30d"
 
+class WaitTimes(BaseModel):
+    """Wait time per visit stage, in minutes"""
+    # wait_times used to be a free-form dict filled from the client. Until a
+    # migration maps the stored keys onto these stages, other keys are dropped
+    # rather than failing validation
+    model_config = ConfigDict(extra='ignore')
+    
+    registration: Optional[float] = None
+    triage: Optional[float] = None
+    consultation: Optional[float] = None
+    diagnostics: Optional[float] = None
+    treatment: Optional[float] = None
+    discharge: Optional[float] = None
+
 class Analytics(Document):
     # Identification
-    analytics_type: AnalyticsType = Field(..., index=True)
-    hospital_id: Optional[str] = Field(None, index=True)
-    patient_id: Optional[str] = Field(None, index=True)
-    region: Optional[str] = Field(None, index=True)
+    analytics_type: AnalyticsType
+    hospital_id: Optional[ObjectId] = None
+    patient_id: Optional[ObjectId] = Field(None, index=True)
+    region: Optional[str] = None
     
     # Time Period
-    period_start: datetime = Field(..., index=True)
+    period_start: datetime
     period_end: datetime = Field(..., index=True)
     
     # Data
@@ -59,28 +76,29 @@ class Analytics(Document):
     # Summary
     title: str
     summary: str
-    key_findings: List[str] = []
-    alerts: List[str] = []
+    key_findings: DelimitedList = []
+    alerts: DelimitedList = []
     
     # Metadata
     generated_by: str  # "ai_service", "scheduled_job", "user_request"
-    data_sources: List[str] = []
+    data_sources: DelimitedList = []
     accuracy_score: Optional[float] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "analytics"
+        bson_encoders = DELIMITED_BSON_ENCODERS
+        # Unset optionals (also inside embedded lists) are omitted from stored BSON
+        keep_nulls = False
+        # Equality keys first, then period_start descending for newest-first ranges
         indexes = [
-            "analytics_type",
-            "hospital_id",
             "patient_id",
-            "region",
-            "period_start",
             "period_end",
             [("hospital_id", 1), ("analytics_type", 1)],
-            [("period_start", 1), ("analytics_type", 1)]
+            [("analytics_type", 1), ("period_start", -1)],
+            [("region", 1), ("analytics_type", 1), ("period_start", -1)]
         ]
 
 class HealthAlert(Document):
@@ -103,38 +121,39 @@ class HealthAlert(Document):
     
     # Status
     status: str = "active"  # active, resolved, expired
-    issued_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    issued_at: datetime = Field(default_factory=utcnow)
     expires_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
     
     # Actions
-    recommended_actions: List[str] = []
-    emergency_contacts: List[str] = []
-    external_links: List[str] = []
+    recommended_actions: DelimitedList = []
+    emergency_contacts: DelimitedList = []
+    external_links: DelimitedList = []
     
     # Tracking
     views: int = 0
     acknowledgments: int = 0
     shares: int = 0
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "health_alerts"
+        bson_encoders = DELIMITED_BSON_ENCODERS
+        # Active-alert dashboards filter on status/severity and read newest first;
+        # the unfiltered admin listing sorts on issued_at alone
         indexes = [
             "alert_type",
             "severity", 
-            "status",
-            "issued_at",
             "region",
-            [("status", 1), ("severity", 1)],
-            [("issued_at", 1), ("status", 1)]
+            [("issued_at", -1)],
+            [("status", 1), ("severity", 1), ("issued_at", -1)]
         ]
 
 class PatientOutcome(Document):
-    patient_id: str = Field(..., index=True)
-    hospital_id: str = Field(..., index=True)
+    patient_id: str
+    hospital_id: str
     
     # Visit Details
     visit_id: Optional[str] = None
@@ -161,20 +180,33 @@ class PatientOutcome(Document):
     
     # Quality Indicators
     care_quality_score: Optional[float] = None
-    wait_times: dict = {}  # {"registration": 15, "consultation": 30} in minutes
+    wait_times: WaitTimes = Field(default_factory=WaitTimes)
     follow_up_compliance: bool = False
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "patient_outcomes"
+        # Stages without a recorded wait time are left out of wait_times
+        keep_nulls = False
         indexes = [
-            "patient_id",
-            "hospital_id",
             "admission_date",
             "outcome_type",
             "readmission_30d",
             [("hospital_id", 1), ("admission_date", 1)],
             [("patient_id", 1), ("admission_date", 1)]
-        ]
\ No newline at end of file
+        ]
+
+class PatientOutcomeCard(BaseModel):
+    """Projection of PatientOutcome for list views and summary statistics"""
+    id: ObjectId = Field(validation_alias="_id")
+    patient_id: str
+    hospital_id: str
+    admission_date: datetime
+    discharge_date: Optional[datetime] = None
+    length_of_stay: Optional[int] = None
+    primary_diagnosis: str
+    outcome_type: str
+    satisfaction_score: Optional[float] = None
+    readmission_30d: bool = False
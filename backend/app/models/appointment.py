@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
 from enum import Enum
+from app.utils.clock import utcnow
 
 class AppointmentStatus(str, Enum):
     SCHEDULED = "scheduled"
@@ -32,7 +33,7 @@ class Appointment(Document):
     doctor_notes: Optional[str] = None
     meeting_url: Optional[str] = None  # For telemedicine
     meeting_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     updated_at: Optional[datetime] = None
     
     class Settings:
@@ -1,30 +1,33 @@
-from beanie import Document
+from beanie import Document, TimeSeriesConfig, Granularity
 from pydantic import Field
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
+from app.utils.clock import utcnow
 
 
 class CapacityLog(Document):
     """Real-time capacity logging for analytics"""
-    hospital_id: ObjectId = Field(index=True)
+    hospital_id: ObjectId
     beds_occupied: int
     icu_occupied: int
     ventilators_occupied: int
-    timestamp: datetime = Field(default_factory=datetime.utcnow, index=True)
+    timestamp: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "capacity_logs"
+        # Timeseries collections index their meta and time fields already, so
+        # only the compound index for per-hospital history is declared
         indexes = [
-            "hospital_id",
-            "timestamp",
             [("hospital_id", 1), ("timestamp", -1)]
         ]
-        # TTL index to auto-delete logs older than 30 days
-        timeseries = {
-            "time_field": "timestamp",
-            "meta_field": "hospital_id",
-            "granularity": "hours"
-        }
+        # Buckets expire after 90 days; MongoDB compresses timeseries buckets
+        # with zstd by default, so no storage engine options are needed
+        timeseries = TimeSeriesConfig(
+            time_field="timestamp",
+            meta_field="hospital_id",
+            granularity=Granularity.hours,
+            expire_after_seconds=90 * 24 * 60 * 60
+        )
     
     class Config:
         json_schema_extra = {
@@ -0,0 +1,42 @@
+"""
+Compact storage for short free-text string lists.
+
+DelimitedList fields are stored in MongoDB as a single unit-separator joined
+string instead of a BSON array (no per-element type/key/length overhead),
+while models and API responses still see a list. Documents using it must
+include DELIMITED_BSON_ENCODERS in Settings.bson_encoders.
+
+Lists that cannot round-trip through a joined string (an element containing
+the delimiter, or a single empty string, which would read back as []) are
+stored as a plain array instead.
+
+Only use it for lists that are never queried element-wise.
+"""
+from pydantic import AfterValidator, BeforeValidator
+from typing import Annotated, List
+
+
+DELIMITER = "\x1f"
+
+
+class _DelimitedList(list):
+    """Marker list type encoded as a joined string by DELIMITED_BSON_ENCODERS"""
+
+
+def _split(value):
+    """Accept the stored joined string as well as a plain list"""
+    if isinstance(value, str):
+        return value.split(DELIMITER) if value else []
+    return value
+
+
+def _join(value):
+    """Join into one string, falling back to an array when that would be lossy"""
+    if value == [""] or any(DELIMITER in item for item in value):
+        return list(value)
+    return DELIMITER.join(value)
+
+
+DelimitedList = Annotated[List[str], BeforeValidator(_split), AfterValidator(_DelimitedList)]
+
+DELIMITED_BSON_ENCODERS = {_DelimitedList: _join}
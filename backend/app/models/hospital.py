@@ -1,18 +1,25 @@
-from beanie import Document, Link
-from pydantic import Field, EmailStr
+from beanie import Document, Link, before_event, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from pydantic import Field, EmailStr, PrivateAttr, BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
+from app.models import hospital_math
+from app.models.hospital_math import CAPACITY_FIELDS
+from app.utils.clock import utcnow
+from app.services.model_cache import model_cache
+from app.services.response_cache import response_cache
 
 
-class GeoLocation(dict):
+class GeoLocation(BaseModel):
     """GeoJSON Point for MongoDB geospatial queries"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     type: str = "Point"
     coordinates: List[float]  # [longitude, latitude]
 
 
-class HospitalCapacity(dict):
+class HospitalCapacity(BaseModel):
     """Embedded document for hospital capacity"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     total_beds: int = 0
     available_beds: int = 0
     icu_beds: int = 0
@@ -21,8 +28,9 @@ class HospitalCapacity(dict):
     available_ventilators: int = 0
 
 
-class HospitalSubscription(dict):
+class HospitalSubscription(BaseModel):
     """Embedded document for subscription details"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     plan: str = "free"  # 'free' or 'paid'
     expires_at: Optional[datetime] = None
     started_at: Optional[datetime] = None
@@ -57,8 +65,11 @@ class Hospital(Document):
     review_count: int = 0
     specializations: List[str] = []
     wallet_id: Optional[ObjectId] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    # Denormalized from capacity on every write (see refresh_load)
+    load_probability: str = "low"
+    occupancy_avg: float = 0.0
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "hospitals"
@@ -66,31 +77,47 @@ class Hospital(Document):
             "user_id",
             "city",
             "email",
-            [("location", "2dsphere")]  # Geospatial index
+            [("location", "2dsphere")],  # Geospatial index
+            [("load_probability", 1), ("occupancy_avg", 1)],
+            [("subscription.plan", 1)]
         ]
     
+    # (capacity values, occupancy, load probability) from the last computation
+    _occupancy_cache: Optional[tuple] = PrivateAttr(default=None)
+    
+    def _occupancy(self) -> tuple:
+        """Occupancy and load probability, recomputed only when capacity values change"""
+        # Keyed on the values, since routes also mutate the capacity dict in place
+        key = tuple(self.capacity.get(field, 0) for field in CAPACITY_FIELDS)
+        cached = self._occupancy_cache
+        if cached is None or cached[0] != key:
+            beds, icu, ventilators = hospital_math.occupancy_row(self.capacity)
+            occupancy = {"beds": beds, "icu": icu, "ventilators": ventilators}
+            cached = self._occupancy_cache = (key, occupancy, hospital_math.load_probability(beds, icu, ventilators))
+        return cached
+    
     def get_occupancy_percentage(self) -> dict:
-        """Calculate occupancy percentages"""
-        capacity = self.capacity
-        return {
-            "beds": round((1 - capacity["available_beds"] / capacity["total_beds"]) * 100, 2) if capacity["total_beds"] > 0 else 0,
-            "icu": round((1 - capacity["available_icu_beds"] / capacity["icu_beds"]) * 100, 2) if capacity["icu_beds"] > 0 else 0,
-            "ventilators": round((1 - capacity["available_ventilators"] / capacity["ventilators"]) * 100, 2) if capacity["ventilators"] > 0 else 0
-        }
+        """Calculate occupancy percentages (see hospital_math.occupancy_row)"""
+        return dict(self._occupancy()[1])
     
     def get_load_probability(self) -> str:
         """Get load probability status"""
+        return self._occupancy()[2]
+    
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def refresh_load(self):
+        """Recompute the denormalized load fields from capacity"""
         occupancy = self.get_occupancy_percentage()
-        avg_occupancy = (occupancy["beds"] + occupancy["icu"] + occupancy["ventilators"]) / 3
-        
-        if avg_occupancy < 50:
-            return "low"
-        elif avg_occupancy < 75:
-            return "medium"
-        elif avg_occupancy < 90:
-            return "high"
-        else:
-            return "critical"
+        self.occupancy_avg = round((occupancy["beds"] + occupancy["icu"] + occupancy["ventilators"]) / 3, 2)
+        self.load_probability = self.get_load_probability()
+    
+    @after_event(Insert, Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_cache(self):
+        """Drop this hospital from the shared caches after a write"""
+        model_cache.invalidate(Hospital, self.id)
+        # Both admin listings show hospital details
+        response_cache.invalidate("admin_hospitals")
+        response_cache.invalidate("admin_advertisements")
     
     class Config:
         json_schema_extra = {
@@ -103,3 +130,15 @@ class Hospital(Document):
                 }
             }
         }
+
+
+class HospitalCard(BaseModel):
+    """Projection of Hospital for admin listings, without location and ratings"""
+    id: ObjectId = Field(validation_alias="_id")
+    name: str
+    city: str
+    email: str
+    phone: str
+    subscription: dict = {}
+    capacity: dict = {}
+    created_at: datetime
@@ -0,0 +1,130 @@
+"""
+Vectorized capacity math for hospitals.
+
+Occupancy and load probability are computed for many hospitals at once from a
+(N, 6) capacity matrix instead of per-instance Python arithmetic.
+"""
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+import numpy as np
+
+
+# Column order of the capacity matrix
+CAPACITY_FIELDS = (
+    "total_beds",
+    "available_beds",
+    "icu_beds",
+    "available_icu_beds",
+    "ventilators",
+    "available_ventilators",
+)
+
+# Average occupancy thresholds separating the load probability labels
+LOAD_THRESHOLD_VALUES = (50, 75, 90)
+LOAD_THRESHOLDS = np.array(LOAD_THRESHOLD_VALUES)
+LOAD_LABELS = ("low", "medium", "high", "critical")
+
+
+def capacity_matrix(capacities: Iterable[dict]) -> np.ndarray:
+    """
+    Build the (N, 6) capacity matrix from hospital capacity dicts
+
+    Args:
+        capacities: Iterable of Hospital.capacity dicts
+
+    Returns:
+        Integer array with one row per hospital, columns as CAPACITY_FIELDS
+    """
+    flat = np.fromiter(
+        (capacity.get(field, 0) or 0 for capacity in capacities for field in CAPACITY_FIELDS),
+        dtype=np.int64
+    )
+    return flat.reshape(-1, len(CAPACITY_FIELDS))
+
+
+def occupancy_batch(arr: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Calculate occupancy percentages for every row of a capacity matrix
+
+    Args:
+        arr: (N, 6) capacity matrix, see capacity_matrix
+
+    Returns:
+        (beds, icu, ventilators) float arrays, 0 where the total is 0
+    """
+    arr = np.asarray(arr, dtype=np.float64).reshape(-1, len(CAPACITY_FIELDS))
+    total = arr[:, 0::2]
+    available = arr[:, 1::2]
+
+    has_total = total > 0
+    ratio = np.divide(available, total, out=np.ones_like(total), where=has_total)
+    occupancy = np.round(100 * (1 - ratio), 2)
+
+    return occupancy[:, 0], occupancy[:, 1], occupancy[:, 2]
+
+
+def load_probability_batch(beds: np.ndarray, icu: np.ndarray, ventilators: np.ndarray) -> List[str]:
+    """
+    Map occupancy arrays to load probability labels
+
+    Args:
+        beds: Bed occupancy percentages
+        icu: ICU occupancy percentages
+        ventilators: Ventilator occupancy percentages
+
+    Returns:
+        One of LOAD_LABELS per hospital
+    """
+    mean = (beds + icu + ventilators) / 3
+    return [LOAD_LABELS[i] for i in np.digitize(mean, LOAD_THRESHOLDS)]
+
+
+def occupancy_dicts(capacities: Iterable[dict]) -> Tuple[List[dict], List[str]]:
+    """
+    Occupancy dicts and load probabilities for a list of hospitals
+
+    Args:
+        capacities: Iterable of Hospital.capacity dicts
+
+    Returns:
+        (occupancies, load_probabilities) in input order
+    """
+    beds, icu, ventilators = occupancy_batch(capacity_matrix(capacities))
+    occupancies = [
+        {"beds": b, "icu": i, "ventilators": v}
+        for b, i, v in zip(beds.tolist(), icu.tolist(), ventilators.tolist())
+    ]
+    return occupancies, load_probability_batch(beds, icu, ventilators)
+
+
+def _percent_used(total: int, available: int) -> float:
+    """Occupancy of one resource, rounded like np.round(..., 2)"""
+    if total <= 0:
+        return 0.0
+    return round(100 * (1 - available / total) * 100) / 100
+
+
+def occupancy_row(capacity: dict) -> Tuple[float, float, float]:
+    """
+    Scalar occupancy for a single hospital
+
+    Same results as occupancy_batch, without the NumPy call overhead that
+    dominates for a single row.
+
+    Args:
+        capacity: Hospital.capacity dict
+
+    Returns:
+        (beds, icu, ventilators) occupancy percentages
+    """
+    get = capacity.get
+    return (
+        _percent_used(get("total_beds", 0) or 0, get("available_beds", 0) or 0),
+        _percent_used(get("icu_beds", 0) or 0, get("available_icu_beds", 0) or 0),
+        _percent_used(get("ventilators", 0) or 0, get("available_ventilators", 0) or 0),
+    )
+
+
+def load_probability(beds: float, icu: float, ventilators: float) -> str:
+    """Scalar counterpart of load_probability_batch"""
+    return LOAD_LABELS[bisect_right(LOAD_THRESHOLD_VALUES, (beds + icu + ventilators) / 3)]
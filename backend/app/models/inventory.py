@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
 from enum import Enum
+from app.utils.clock import utcnow
 
 
 class InventoryCategory(str, Enum):
@@ -22,8 +23,8 @@ class Inventory(Document):
     reorder_threshold: int = 0
     unit_price: float = 0.0
     last_reorder_date: Optional[datetime] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "inventory"
@@ -1,8 +1,12 @@
 from typing import List, Optional
 from beanie import Document
-from pydantic import BaseModel, Field
+from beanie import PydanticObjectId as ObjectId
+from pymongo import IndexModel
+from pydantic import BaseModel, Field, model_validator
 from datetime import datetime, time
 from enum import Enum
+from app.models.delimited import DelimitedList, DELIMITED_BSON_ENCODERS
+from app.utils.clock import utcnow
 
 class MedicationFrequency(str, Enum):
     ONCE_DAILY = "once_daily"
@@ -34,7 +38,7 @@ class MedicationInteraction(BaseModel):
 class SideEffect(BaseModel):
     name: str
     severity: str
-    reported_date: datetime = Field(default_factory=datetime.utcnow)
+    reported_date: datetime = Field(default_factory=utcnow)
     resolved: bool = False
 
 class MedicationAdherence(BaseModel):
@@ -42,12 +46,28 @@ class MedicationAdherence(BaseModel):
     scheduled_doses: int
     taken_doses: int
     missed_doses: int
-    adherence_percentage: float
+    # Stored as hundredths of a percent (0-10000) to keep adherence logs compact
+    adherence_percentage_x100: int = Field(..., ge=0, le=10000)
+    
+    @model_validator(mode="before")
+    @classmethod
+    def quantize_percentage(cls, data):
+        """Accept adherence_percentage as a float, as written by older records"""
+        if isinstance(data, dict) and "adherence_percentage" in data:
+            data = dict(data)
+            percentage = data.pop("adherence_percentage")
+            data.setdefault("adherence_percentage_x100", round(percentage * 100))
+        return data
+    
+    @property
+    def adherence_percentage(self) -> float:
+        """Adherence as a percentage with two decimals"""
+        return self.adherence_percentage_x100 / 100
 
 class Medication(Document):
-    patient_id: str = Field(..., index=True)
-    hospital_id: str = Field(..., index=True)
-    prescribed_by: str  # Doctor ID
+    patient_id: ObjectId
+    hospital_id: ObjectId = Field(..., index=True)
+    prescribed_by: ObjectId  # Doctor user ID
     
     # Medication Details
     name: str
@@ -69,7 +89,7 @@ class Medication(Document):
     
     # Status & Tracking
     status: MedicationStatus = MedicationStatus.ACTIVE
-    start_date: datetime = Field(default_factory=datetime.utcnow)
+    start_date: datetime = Field(default_factory=utcnow)
     end_date: Optional[datetime] = None
     
     # Interactions & Side Effects
@@ -85,13 +105,14 @@ class Medication(Document):
     pharmacy_name: Optional[str] = None
     pharmacy_contact: Optional[str] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "medications"
+        # Unset optionals (also inside embedded lists) are omitted from stored BSON
+        keep_nulls = False
         indexes = [
-            "patient_id",
             "hospital_id", 
             "prescribed_by",
             "status",
@@ -99,12 +120,27 @@ class Medication(Document):
             [("patient_id", 1), ("status", 1)]
         ]
 
+class MedicationCard(BaseModel):
+    """Projection of Medication for list views, without embedded logs and schedules"""
+    id: ObjectId = Field(validation_alias="_id")
+    name: str
+    generic_name: Optional[str] = None
+    dosage: str
+    form: str
+    frequency: MedicationFrequency
+    instructions: str
+    status: MedicationStatus
+    start_date: datetime
+    end_date: Optional[datetime] = None
+    last_taken: Optional[datetime] = None
+    next_due: Optional[datetime] = None
+
 class MedicationReminder(Document):
-    patient_id: str = Field(..., index=True)
+    patient_id: ObjectId
     medication_id: str = Field(..., index=True)
     
     # Reminder Details
-    scheduled_time: datetime = Field(..., index=True)
+    scheduled_time: datetime
     medication_name: str
     dosage: str
     instructions: str
@@ -120,51 +156,49 @@ class MedicationReminder(Document):
     acknowledged_at: Optional[datetime] = None
     taken_at: Optional[datetime] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "medication_reminders"
         indexes = [
-            "patient_id",
             "medication_id",
-            "scheduled_time",
             [("patient_id", 1), ("sent", 1)],
             [("scheduled_time", 1), ("sent", 1)]
         ]
 
 class Prescription(Document):
-    patient_id: str = Field(..., index=True)
-    hospital_id: str = Field(..., index=True)
-    doctor_id: str = Field(..., index=True)
+    patient_id: ObjectId
+    hospital_id: ObjectId = Field(..., index=True)
+    doctor_id: ObjectId = Field(..., index=True)
     
     # Prescription Details
-    prescription_number: str = Field(..., unique=True, index=True)
+    prescription_number: str
     medications: List[str] = []  # Medication IDs
     
     # Medical Context
     diagnosis: Optional[str] = None
-    symptoms: List[str] = []
+    symptoms: DelimitedList = []
     notes: Optional[str] = None
     
     # Prescription Status
     status: str = "active"  # active, completed, cancelled
-    issued_date: datetime = Field(default_factory=datetime.utcnow)
+    issued_date: datetime = Field(default_factory=utcnow)
     expiry_date: Optional[datetime] = None
     
     # Digital Signature
     digital_signature: Optional[str] = None
     verification_code: Optional[str] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "prescriptions"
+        bson_encoders = DELIMITED_BSON_ENCODERS
         indexes = [
-            "patient_id",
             "hospital_id",
             "doctor_id",
-            "prescription_number",
+            IndexModel([("prescription_number", 1)], unique=True, name="uq_prescription_number"),
             "status",
             [("patient_id", 1), ("status", 1)]
         ]
\ No newline at end of file
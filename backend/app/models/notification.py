@@ -4,6 +4,7 @@ from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
 from enum import Enum
+from app.utils.clock import utcnow
 
 class NotificationType(str, Enum):
     SURGE_ALERT = "surge_alert"
@@ -25,7 +26,7 @@ class Notification(Document):
     message: str
     data: Optional[dict] = None  # Additional data for the notification
     status: NotificationStatus = NotificationStatus.UNREAD
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     read_at: Optional[datetime] = None
     
     class Settings:
@@ -0,0 +1,32 @@
+"""
+Compact storage for free-form dict blobs.
+
+PackedDict fields are stored in MongoDB as a single msgpack-encoded binary
+value instead of a BSON subdocument (no per-key type tags or repeated key
+strings), while models still see a dict. Documents using it must include
+PACKED_BSON_ENCODERS in Settings.bson_encoders, and code reading raw
+documents must pass the field through unpack().
+
+Only use it for blobs that are never queried by key.
+"""
+from bson import Binary
+from pydantic import AfterValidator, BeforeValidator
+from typing import Annotated
+import ormsgpack
+
+
+class _PackedDict(dict):
+    """Marker dict type encoded as msgpack bytes by PACKED_BSON_ENCODERS"""
+
+
+def unpack(value):
+    """Accept the stored msgpack bytes as well as a plain dict"""
+    if isinstance(value, (bytes, bytearray)):
+        return ormsgpack.unpackb(value)
+    return value
+
+
+PackedDict = Annotated[dict, BeforeValidator(unpack), AfterValidator(_PackedDict)]
+
+# Values msgpack has no type for (e.g. ObjectId) are stored as strings
+PACKED_BSON_ENCODERS = {_PackedDict: lambda value: Binary(ormsgpack.packb(dict(value), default=str))}
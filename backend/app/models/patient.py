@@ -1,12 +1,14 @@
 from beanie import Document
-from pydantic import Field
-from typing import Optional, List, List
+from pydantic import Field, BaseModel, ConfigDict
+from typing import Optional, List
 from datetime import datetime, date
 from beanie import PydanticObjectId as ObjectId
+from app.utils.clock import utcnow
 
 
-class MedicalHistoryEntry(dict):
+class MedicalHistoryEntry(BaseModel):
     """Embedded document for medical history"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     condition: str
     diagnosed_date: datetime
     notes: Optional[str] = None
@@ -22,9 +24,9 @@ class Patient(Document):
     address: str = ""
     city: str = ""
     state: str = ""
-    medical_history: List[dict] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    medical_history: List[MedicalHistoryEntry] = []
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "patients"
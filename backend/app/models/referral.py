@@ -1,9 +1,10 @@
 from beanie import Document
-from pydantic import Field
+from pydantic import Field, BaseModel, ConfigDict
 from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
 from enum import Enum
+from app.utils.clock import utcnow
 
 
 class ReferralStatus(str, Enum):
@@ -14,8 +15,9 @@ class ReferralStatus(str, Enum):
     COMPLETED = "completed"
 
 
-class ReferralPayment(dict):
+class ReferralPayment(BaseModel):
     """Embedded document for payment details"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     patient_amount: float = 150.0
     platform_fee: float = 40.0
     hospital_share: float = 110.0
@@ -39,8 +41,8 @@ class Referral(Document):
     reason: Optional[str] = None
     razorpay_order_id: Optional[str] = None
     razorpay_payment_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "referrals"
@@ -49,6 +51,7 @@ class Referral(Document):
             "from_hospital_id",
             "to_hospital_id",
             "status",
+            "created_at",
             [("from_hospital_id", 1), ("status", 1)],
             [("to_hospital_id", 1), ("status", 1)]
         ]
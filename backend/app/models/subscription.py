@@ -1,18 +1,23 @@
 from beanie import Document
+from pymongo import IndexModel
 from pydantic import Field
 from typing import List
 from datetime import datetime
+from app.utils.clock import utcnow
 
 
 class SubscriptionPlan(Document):
     """Subscription plan model"""
-    name: str = Field(unique=True)  # 'Free' or 'Paid'
+    name: str  # 'Free' or 'Paid'
     monthly_price: float = 0.0
     features: List[str] = []
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "subscription_plans"
+        indexes = [
+            IndexModel([("name", 1)], unique=True, name="uq_subscription_plan_name")
+        ]
     
     class Config:
         json_schema_extra = {
@@ -1,20 +1,23 @@
 from beanie import Document
-from pydantic import Field
+from pydantic import Field, BaseModel, ConfigDict
 from typing import Optional, List
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
+from app.utils.clock import utcnow
 
 
-class SurgeFactors(dict):
+class SurgeFactors(BaseModel):
     """Embedded document for surge prediction factors"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     weather: Optional[str] = None
     festivals: List[str] = []
     pollution_index: Optional[float] = None
     historical_trend: Optional[str] = None
 
 
-class SurgeRecommendations(dict):
+class SurgeRecommendations(BaseModel):
     """Embedded document for AI recommendations"""
+    model_config = ConfigDict(extra="forbid", frozen=True)
     staff_count: Optional[int] = None
     bed_allocation: Optional[int] = None
 
@@ -27,7 +30,7 @@ class SurgePrediction(Document):
     confidence_score: float = 0.0  # 0.0 to 1.0
     factors: dict = Field(default_factory=dict)
     recommendations: dict = Field(default_factory=dict)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "surge_predictions"
@@ -1,8 +1,30 @@
-from typing import List, Optional
-from beanie import Document
-from pydantic import BaseModel, Field
+from typing import Annotated, Dict, List, Optional
+from beanie import Document, TimeSeriesConfig, Granularity
+from beanie import PydanticObjectId as ObjectId
+from pymongo import IndexModel
+from pydantic import BaseModel, BeforeValidator, ConfigDict, Field
 from datetime import datetime
 from enum import Enum
+import numpy as np
+from app.utils.clock import utcnow
+from app.models.hospital import GeoLocation
+from app.models.packed import PackedDict, PACKED_BSON_ENCODERS
+
+# Server-side expiry for telemetry and emergency alerts. Both are
+# collection-wide, so a shorter IoTDevice.data_retention_days still needs an
+# application-level sweep; these bound how long anything is kept.
+HEALTH_DATA_RETENTION_SECONDS = 90 * 24 * 60 * 60
+EMERGENCY_ALERT_RETENTION_SECONDS = 365 * 24 * 60 * 60
+
+def _from_lat_lng(value):
+    """Accept the [lat, lng] pairs that older clients send and documents store"""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        lat, lng = value
+        return {"type": "Point", "coordinates": [lng, lat]}
+    return value
+
+# GeoJSON Point ([lng, lat]) that also validates legacy [lat, lng] lists
+GeoPoint = Annotated[GeoLocation, BeforeValidator(_from_lat_lng)]
 
 class DeviceType(str, Enum):
     BLOOD_PRESSURE_MONITOR = "blood_pressure_monitor"
@@ -23,26 +45,91 @@ class DeviceStatus(str, Enum):
     ERROR = "error"
 
 class VitalSign(BaseModel):
+    model_config = ConfigDict(frozen=True)
     type: str  # "blood_pressure", "heart_rate", "temperature", etc.
     value: float
     unit: str
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utcnow)
     normal_range: dict = {}  # {"min": 80, "max": 120}
     is_abnormal: bool = False
     notes: Optional[str] = None
 
+# Samples per VitalBlock, so abnormal_bits fits a signed 64-bit BSON int
+VITAL_BLOCK_SIZE = 63
+
+class VitalBlock(BaseModel):
+    """Readings of one parameter stored column-wise instead of one dict per sample"""
+    parameter: str  # VitalSign.type
+    unit: str
+    values: List[float] = []
+    timestamps: List[datetime] = []
+    normal_range: dict = {}
+    abnormal_bits: int = 0  # bit i is set when sample i is abnormal
+    
+    def is_abnormal(self, index: int) -> bool:
+        return bool((self.abnormal_bits >> index) & 1)
+    
+    @classmethod
+    def from_vital_signs(cls, vital_signs: List[VitalSign]) -> List["VitalBlock"]:
+        """
+        Group vital signs into blocks by parameter and unit
+        
+        Args:
+            vital_signs: Samples in arrival order
+            
+        Returns:
+            Blocks in order of first appearance, each holding at most
+            VITAL_BLOCK_SIZE samples
+        """
+        blocks = []
+        open_blocks: Dict[tuple, "VitalBlock"] = {}
+        for vital_sign in vital_signs:
+            key = (vital_sign.type, vital_sign.unit)
+            block = open_blocks.get(key)
+            if block is None or len(block.values) >= VITAL_BLOCK_SIZE:
+                block = open_blocks[key] = cls(
+                    parameter=vital_sign.type,
+                    unit=vital_sign.unit,
+                    normal_range=vital_sign.normal_range
+                )
+                blocks.append(block)
+            if vital_sign.is_abnormal:
+                block.abnormal_bits |= 1 << len(block.values)
+            block.values.append(vital_sign.value)
+            block.timestamps.append(vital_sign.timestamp)
+        return blocks
+
 class AlertRule(BaseModel):
+    model_config = ConfigDict(frozen=True)
     parameter: str  # "heart_rate", "blood_pressure_systolic"
     condition: str  # "greater_than", "less_than", "between"
     threshold_value: float
     threshold_max: Optional[float] = None
     alert_message: str
     severity: str  # "low", "medium", "high"
+    
+    def evaluate_batch(self, values: np.ndarray) -> np.ndarray:
+        """
+        Check many readings of this rule's parameter at once
+        
+        Args:
+            values: Float array of readings
+            
+        Returns:
+            Boolean mask, True where the reading triggers the rule
+        """
+        if self.condition == "greater_than":
+            return values > self.threshold_value
+        if self.condition == "less_than":
+            return values < self.threshold_value
+        if self.condition == "between" and self.threshold_max:
+            return (values < self.threshold_value) | (values > self.threshold_max)
+        return np.zeros(values.shape, dtype=bool)
 
 class IoTDevice(Document):
     device_id: str = Field(..., unique=True, index=True)
-    patient_id: str = Field(..., index=True)
-    hospital_id: Optional[str] = Field(None, index=True)
+    patient_id: ObjectId = Field(..., index=True)
+    hospital_id: Optional[ObjectId] = Field(None, index=True)
     
     # Device Information
     device_type: DeviceType
@@ -64,42 +151,40 @@ class IoTDevice(Document):
     
     # Location
     location: Optional[str] = None
-    coordinates: Optional[List[float]] = None  # [lat, lng]
+    coordinates: Optional[GeoPoint] = None
     
     # Connectivity
     connection_type: str = "bluetooth"  # "bluetooth", "wifi", "cellular"
     last_ip_address: Optional[str] = None
     
-    registered_at: datetime = Field(default_factory=datetime.utcnow)
+    registered_at: datetime = Field(default_factory=utcnow)
     last_maintenance: Optional[datetime] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "iot_devices"
         indexes = [
             "device_id",
-            "patient_id",
             "hospital_id",
-            "device_type",
-            "status",
             [("patient_id", 1), ("status", 1)],
-            [("device_type", 1), ("status", 1)]
+            [("device_type", 1), ("status", 1)],
+            [("coordinates", "2dsphere")]
         ]
 
 class HealthData(Document):
     device_id: str = Field(..., index=True)
-    patient_id: str = Field(..., index=True)
+    patient_id: ObjectId = Field(..., index=True)
     
     # Data Collection
-    vital_signs: List[VitalSign] = []
-    raw_data: dict = {}  # Original device data
-    processed_data: dict = {}  # Processed/calculated values
+    blocks: List[VitalBlock] = []
+    raw_data: PackedDict = {}  # Original device data
+    processed_data: PackedDict = {}  # Processed/calculated values
     
     # Timestamp
     recorded_at: datetime = Field(..., index=True)
-    received_at: datetime = Field(default_factory=datetime.utcnow)
+    received_at: datetime = Field(default_factory=utcnow)
     
     # Data Quality
     quality_score: float = 1.0  # 0.0 to 1.0
@@ -114,24 +199,61 @@ class HealthData(Document):
     # Alerts Generated
     alerts_triggered: List[str] = []
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "health_data"
+        bson_encoders = PACKED_BSON_ENCODERS
+        # One device always reports for the same patient, so buckets are keyed
+        # by device; patient timelines use the compound index below
         indexes = [
-            "device_id",
-            "patient_id",
-            "recorded_at",
             [("patient_id", 1), ("recorded_at", -1)],
             [("device_id", 1), ("recorded_at", -1)]
         ]
+        # Readings are write-once, so they are stored as a timeseries; the
+        # collection-level expiry replaces the recorded_at TTL index, which
+        # timeseries collections don't support
+        timeseries = TimeSeriesConfig(
+            time_field="recorded_at",
+            meta_field="device_id",
+            granularity=Granularity.minutes,
+            expire_after_seconds=HEALTH_DATA_RETENTION_SECONDS
+        )
+
+class HealthDataHourly(Document):
+    """Per-hour min/max/sum/count of one vital sign parameter for a patient"""
+    patient_id: ObjectId
+    parameter: str  # VitalSign.type
+    unit: Optional[str] = None
+    hour_bucket: datetime  # recorded_at truncated to the hour
+    
+    min: float
+    max: float
+    sum: float = 0.0
+    count: int = 0
+    
+    updated_at: datetime = Field(default_factory=utcnow)
+    
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+    
+    class Settings:
+        name = "health_data_hourly"
+        indexes = [
+            IndexModel(
+                [("patient_id", 1), ("parameter", 1), ("hour_bucket", -1)],
+                unique=True,
+                name="uq_health_data_hourly_bucket"
+            )
+        ]
 
 class TelemedicineSession(Document):
     session_id: str = Field(..., unique=True, index=True)
-    appointment_id: str = Field(..., index=True)
-    patient_id: str = Field(..., index=True)
-    doctor_id: str = Field(..., index=True)
-    hospital_id: str = Field(..., index=True)
+    appointment_id: ObjectId = Field(..., index=True)
+    patient_id: ObjectId = Field(..., index=True)
+    doctor_id: ObjectId = Field(..., index=True)
+    hospital_id: ObjectId = Field(..., index=True)
     
     # Session Details
     session_type: str = "video_consultation"  # "video", "audio_only", "chat"
@@ -171,26 +293,25 @@ class TelemedicineSession(Document):
     technical_issues: List[str] = []
     disconnections: int = 0
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "telemedicine_sessions"
         indexes = [
             "session_id",
             "appointment_id",
-            "patient_id",
-            "doctor_id",
-            "hospital_id",
             "scheduled_start",
-            "status",
-            [("doctor_id", 1), ("scheduled_start", 1)],
-            [("patient_id", 1), ("scheduled_start", 1)]
+            # Equality fields before the scheduled_start range; the id
+            # prefixes also serve lookups by doctor, patient or hospital alone
+            [("doctor_id", 1), ("status", 1), ("scheduled_start", 1)],
+            [("patient_id", 1), ("status", 1), ("scheduled_start", 1)],
+            [("hospital_id", 1), ("status", 1), ("scheduled_start", 1)]
         ]
 
 class EmergencyAlert(Document):
     alert_id: str = Field(..., unique=True, index=True)
-    patient_id: str = Field(..., index=True)
+    patient_id: ObjectId = Field(..., index=True)
     device_id: Optional[str] = Field(None, index=True)
     
     # Alert Details
@@ -200,12 +321,12 @@ class EmergencyAlert(Document):
     
     # Location
     location: Optional[str] = None
-    coordinates: Optional[List[float]] = None
+    coordinates: Optional[GeoPoint] = None
     indoor_location: Optional[str] = None  # "bedroom", "kitchen", etc.
     
     # Status
     status: str = "active"  # "active", "acknowledged", "resolved", "false_alarm"
-    triggered_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    triggered_at: datetime = Field(default_factory=utcnow, index=True)
     acknowledged_at: Optional[datetime] = None
     resolved_at: Optional[datetime] = None
     
@@ -224,19 +345,28 @@ class EmergencyAlert(Document):
     response_time_minutes: Optional[int] = None
     outcome: Optional[str] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "emergency_alerts"
         indexes = [
             "alert_id",
-            "patient_id",
             "device_id",
             "alert_type",
             "severity",
-            "status",
-            "triggered_at",
+            IndexModel(
+                [("triggered_at", 1)],
+                expireAfterSeconds=EMERGENCY_ALERT_RETENTION_SECONDS,
+                name="ttl_triggered_at"
+            ),
             [("patient_id", 1), ("triggered_at", -1)],
-            [("status", 1), ("severity", 1)]
+            # Only active alerts are indexed for the provider dashboard;
+            # resolved history is reached through patient_id
+            IndexModel(
+                [("triggered_at", -1)],
+                partialFilterExpression={"status": "active"},
+                name="active_alerts"
+            ),
+            [("coordinates", "2dsphere")]
         ]
\ No newline at end of file
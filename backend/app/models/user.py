@@ -1,8 +1,9 @@
-from beanie import Document
-from pydantic import EmailStr, Field
+from beanie import Document, PydanticObjectId
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
+from app.utils.clock import utcnow
 
 
 class UserRole(str, Enum):
@@ -25,8 +26,8 @@ class User(Document):
     name: Optional[str] = None
     phone: Optional[str] = None
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "users"
@@ -45,3 +46,14 @@ class User(Document):
                 "is_active": True
             }
         }
+
+
+class AuthUserView(BaseModel):
+    """Projection of User with only the fields needed by authenticated routes"""
+    id: PydanticObjectId = Field(alias="_id")
+    email: EmailStr
+    role: UserRole
+    is_active: bool = True
+    profile_id: Optional[str] = None
+    hospital_id: Optional[str] = None
+    name: Optional[str] = None
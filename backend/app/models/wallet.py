@@ -4,6 +4,8 @@ from typing import Optional
 from datetime import datetime
 from beanie import PydanticObjectId as ObjectId
 from enum import Enum
+from pymongo import ReturnDocument
+from app.utils.clock import utcnow
 
 
 class TransactionType(str, Enum):
@@ -28,8 +30,8 @@ class Wallet(Document):
     balance: float = 0.0
     total_earned: float = 0.0
     total_withdrawn: float = 0.0
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "wallets"
@@ -37,21 +39,34 @@ class Wallet(Document):
             "hospital_id"
         ]
     
+    async def _apply(self, query: dict, inc: dict) -> bool:
+        """Atomically $inc this wallet if it matches query and refresh the local copy"""
+        updated = await Wallet.get_motor_collection().find_one_and_update(
+            {"_id": self.id, **query},
+            {"$inc": inc, "$set": {"updated_at": utcnow()}},
+            projection={"balance": 1, "total_earned": 1, "total_withdrawn": 1, "updated_at": 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if updated is None:
+            return False
+        self.balance = updated["balance"]
+        self.total_earned = updated["total_earned"]
+        self.total_withdrawn = updated["total_withdrawn"]
+        self.updated_at = updated["updated_at"]
+        return True
+    
     async def credit(self, amount: float):
         """Credit wallet"""
-        self.balance += amount
-        self.total_earned += amount
-        self.updated_at = datetime.utcnow()
-        await self.save()
+        if not await self._apply({}, {"balance": amount, "total_earned": amount}):
+            raise ValueError("Wallet not found")
     
     async def debit(self, amount: float):
-        """Debit wallet"""
-        if self.balance < amount:
+        """Debit wallet, checking the balance in the same atomic update"""
+        if not await self._apply(
+            {"balance": {"$gte": amount}},
+            {"balance": -amount, "total_withdrawn": amount}
+        ):
             raise ValueError("Insufficient wallet balance")
-        self.balance -= amount
-        self.total_withdrawn += amount
-        self.updated_at = datetime.utcnow()
-        await self.save()
     
     class Config:
         json_schema_extra = {
@@ -70,14 +85,13 @@ class WalletTransaction(Document):
     transaction_type: TransactionType
     amount: float
     description: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "wallet_transactions"
+        # Platform-wide recency listings sort by _id, which follows created_at
         indexes = [
-            "wallet_id",
             "transaction_type",
-            "created_at",
             [("wallet_id", 1), ("created_at", -1)]
         ]
     
@@ -107,7 +121,7 @@ class PayoutRequest(Document):
     ifsc_code: str
     bank_name: str
     status: PayoutStatus = PayoutStatus.PENDING
-    requested_at: datetime = Field(default_factory=datetime.utcnow)
+    requested_at: datetime = Field(default_factory=utcnow)
     processed_at: Optional[datetime] = None
     admin_notes: Optional[str] = None
     
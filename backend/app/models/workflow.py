@@ -1,9 +1,16 @@
-from typing import List, Optional
-from beanie import Document
-from pydantic import BaseModel, Field
+from typing import Dict, List, Optional
+from beanie import Document, before_event, after_event, Insert, Replace, Save, SaveChanges, Update, Delete
+from pydantic import BaseModel, ConfigDict, Field
+from beanie import PydanticObjectId as ObjectId
 from datetime import datetime
 from enum import Enum
 import json
+import orjson
+from hashlib import blake2b
+from types import MappingProxyType
+from app.utils.clock import utcnow
+from app.models.packed import PackedDict, PACKED_BSON_ENCODERS
+from app.services.model_cache import model_cache
 
 class WorkflowStatus(str, Enum):
     DRAFT = "draft"
@@ -32,6 +39,7 @@ class NodeType(str, Enum):
     DELAY = "delay"
 
 class WorkflowNode(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
     id: str
     type: NodeType
     name: str
@@ -40,11 +48,65 @@ class WorkflowNode(BaseModel):
     connections: List[str] = []  # Connected node IDs
 
 class WorkflowTrigger(BaseModel):
+    model_config = ConfigDict(extra="forbid", frozen=True)
     type: TriggerType
     schedule: Optional[str] = None  # Cron expression for scheduled workflows
     event_type: Optional[str] = None  # Event that triggers workflow
     conditions: dict = {}
 
+def topological_order(nodes: List[WorkflowNode], connections: dict) -> List[int]:
+    """
+    Order node indexes so every node runs after the nodes that feed it
+
+    Edges come from each node's connections plus the workflow-level
+    connections mapping (source node id -> target node id or ids). Ties keep
+    the order of the node list; nodes caught in a cycle are appended in list
+    order.
+
+    Args:
+        nodes: Workflow nodes
+        connections: N8NWorkflow.connections mapping
+
+    Returns:
+        Indexes into nodes in execution order
+    """
+    index: Dict[str, int] = {node.id: i for i, node in enumerate(nodes)}
+    children: List[List[int]] = [[] for _ in nodes]
+    in_degree = [0] * len(nodes)
+
+    def link(source: str, targets):
+        if source not in index:
+            return
+        if isinstance(targets, str):
+            targets = [targets]
+        elif not isinstance(targets, (list, tuple)):
+            return
+        for target in targets:
+            if target in index:
+                children[index[source]].append(index[target])
+                in_degree[index[target]] += 1
+
+    for node in nodes:
+        link(node.id, node.connections)
+    for source, targets in (connections or {}).items():
+        link(source, targets)
+
+    order: List[int] = []
+    ready = [i for i, degree in enumerate(in_degree) if degree == 0]
+    while ready:
+        ready.sort(reverse=True)
+        current = ready.pop()
+        order.append(current)
+        for child in children[current]:
+            in_degree[child] -= 1
+            if in_degree[child] == 0:
+                ready.append(child)
+
+    if len(order) < len(nodes):
+        seen = set(order)
+        order.extend(i for i in range(len(nodes)) if i not in seen)
+    return order
+
 class N8NWorkflow(Document):
     workflow_id: str = Field(..., unique=True, index=True)
     name: str
@@ -54,6 +116,8 @@ class N8NWorkflow(Document):
     nodes: List[WorkflowNode] = []
     connections: dict = {}  # Node connections mapping
     trigger: WorkflowTrigger
+    # Indexes into nodes in dependency order, recomputed on every write
+    execution_order: List[int] = []
     
     # Status and Control
     status: WorkflowStatus = WorkflowStatus.DRAFT
@@ -70,7 +134,7 @@ class N8NWorkflow(Document):
     
     # Permissions
     created_by: str = Field(..., index=True)
-    hospital_id: Optional[str] = Field(None, index=True)
+    hospital_id: Optional[str] = None
     allowed_roles: List[str] = ["admin", "hospital"]
     
     # Statistics
@@ -81,20 +145,54 @@ class N8NWorkflow(Document):
     average_execution_time: float = 0.0
     
     # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "n8n_workflows"
         indexes = [
             "workflow_id",
-            "status",
             "category",
             "created_by",
-            "hospital_id",
             [("status", 1), ("category", 1)],
             [("hospital_id", 1), ("status", 1)]
         ]
+    
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def compile_execution_order(self):
+        """Recompute execution_order from the node graph"""
+        self.execution_order = topological_order(self.nodes, self.connections)
+    
+    @after_event(Replace, Save, SaveChanges, Update, Delete)
+    def invalidate_cache(self):
+        """Drop this workflow from the shared model cache after a write"""
+        model_cache.invalidate(N8NWorkflow, self.workflow_id)
+    
+    def ordered_nodes(self) -> List[WorkflowNode]:
+        """Nodes in execution order, falling back to list order for stale documents"""
+        nodes = self.nodes
+        order = self.execution_order
+        if len(order) != len(nodes):
+            return list(nodes)
+        return [nodes[i] for i in order]
+
+class WorkflowCard(BaseModel):
+    """Projection of N8NWorkflow for list views, without the node graph"""
+    id: ObjectId = Field(validation_alias="_id")
+    workflow_id: str
+    name: str
+    description: Optional[str] = None
+    status: WorkflowStatus
+    is_active: bool = False
+    category: str = "healthcare"
+    tags: List[str] = []
+    hospital_id: Optional[str] = None
+    total_executions: int = 0
+    successful_executions: int = 0
+    failed_executions: int = 0
+    last_execution: Optional[datetime] = None
+    created_at: datetime
+    updated_at: datetime
 
 class WorkflowExecution(Document):
     execution_id: str = Field(..., unique=True, index=True)
@@ -103,10 +201,10 @@ class WorkflowExecution(Document):
     
     # Execution Details
     status: str = "running"  # "running", "success", "failed", "cancelled"
-    trigger_data: dict = {}
+    trigger_data: PackedDict = Field(default_factory=dict, repr=False)
     
     # Timing
-    started_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    started_at: datetime = Field(default_factory=utcnow, index=True)
     completed_at: Optional[datetime] = None
     duration_seconds: Optional[float] = None
     
@@ -116,36 +214,77 @@ class WorkflowExecution(Document):
     failed_nodes: List[str] = []
     
     # Data Flow
-    input_data: dict = {}
-    output_data: dict = {}
-    node_outputs: dict = {}  # {node_id: output_data}
+    input_data: dict = Field(default_factory=dict, repr=False)
+    output_data: dict = Field(default_factory=dict, repr=False)
+    node_outputs: PackedDict = Field(default_factory=dict, repr=False)  # {node_id: output_data}
     
     # Error Handling
     error_message: Optional[str] = None
     error_node: Optional[str] = None
     retry_count: int = 0
     
-    # Logs
-    execution_logs: List[dict] = []
+    # Node logs are ExecutionLogEntry documents keyed by execution_id
     
     # Context
     triggered_by: str  # User ID or system
-    execution_context: dict = {}  # Additional context data
+    execution_context: dict = Field(default_factory=dict, repr=False)  # Additional context data
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "workflow_executions"
+        bson_encoders = PACKED_BSON_ENCODERS
         indexes = [
             "execution_id",
-            "workflow_id",
-            "status",
             "started_at",
             "triggered_by",
-            [("workflow_id", 1), ("started_at", -1)],
+            [("workflow_id", 1), ("status", 1), ("started_at", -1)],
             [("status", 1), ("started_at", -1)]
         ]
 
+class ExecutionCard(BaseModel):
+    """Projection of WorkflowExecution for history listings, without payloads"""
+    id: ObjectId = Field(validation_alias="_id")
+    execution_id: str
+    workflow_id: str
+    workflow_name: str
+    status: str
+    started_at: datetime
+    completed_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    error_message: Optional[str] = None
+    error_node: Optional[str] = None
+    triggered_by: str
+
+class ExecutionLogEntry(Document):
+    """One node result of a WorkflowExecution, stored outside the execution document"""
+    execution_id: str
+    seq: int  # Node position within the execution
+    node_id: str
+    status: str  # "completed", "failed"
+    output: dict = Field(default_factory=dict, repr=False)
+    error: Optional[str] = None
+    timestamp: datetime = Field(default_factory=utcnow)
+    
+    class Settings:
+        name = "workflow_execution_log_entries"
+        indexes = [
+            [("execution_id", 1), ("seq", 1)]
+        ]
+
+def template_hash(template_data: dict) -> str:
+    """
+    Content hash of a template definition, independent of key order
+
+    Args:
+        template_data: WorkflowTemplate.template_data
+
+    Returns:
+        32-character hex digest
+    """
+    canonical = orjson.dumps(template_data, default=str, option=orjson.OPT_SORT_KEYS)
+    return blake2b(canonical, digest_size=16).hexdigest()
+
 class WorkflowTemplate(Document):
     template_id: str = Field(..., unique=True, index=True)
     name: str
@@ -153,7 +292,8 @@ class WorkflowTemplate(Document):
     category: str
     
     # Template Definition
-    template_data: dict = {}  # Complete workflow structure
+    template_data: dict = Field(default_factory=dict, repr=False)  # Complete workflow structure
+    template_hash: str = ""  # Recomputed from template_data on every write
     parameters: List[dict] = []  # Required parameters for template
     
     # Usage
@@ -171,8 +311,8 @@ class WorkflowTemplate(Document):
     required_integrations: List[str] = []
     complexity_level: str = "beginner"  # "beginner", "intermediate", "advanced"
     
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "workflow_templates"
@@ -181,8 +321,14 @@ class WorkflowTemplate(Document):
             "category",
             "author",
             "is_public",
+            "template_hash",
             [("category", 1), ("rating", -1)]
         ]
+    
+    @before_event(Insert, Replace, Save, SaveChanges)
+    def refresh_template_hash(self):
+        """Recompute template_hash from template_data"""
+        self.template_hash = template_hash(self.template_data)
 
 class AutomationRule(Document):
     rule_id: str = Field(..., unique=True, index=True)
@@ -191,10 +337,10 @@ class AutomationRule(Document):
     
     # Rule Configuration
     trigger_conditions: dict = {}  # Conditions that activate the rule
-    actions: List[dict] = []  # Actions to execute when triggered
+    actions: List[dict] = Field(default_factory=list, repr=False)  # Actions to execute when triggered
     
     # Scope
-    hospital_id: Optional[str] = Field(None, index=True)
+    hospital_id: Optional[str] = None
     department: Optional[str] = None
     applies_to: str = "all"  # "all", "patients", "staff", "specific"
     target_ids: List[str] = []  # Specific IDs if applies_to is "specific"
@@ -216,15 +362,13 @@ class AutomationRule(Document):
     
     # Configuration
     created_by: str = Field(..., index=True)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utcnow)
+    updated_at: datetime = Field(default_factory=utcnow)
     
     class Settings:
         name = "automation_rules"
         indexes = [
             "rule_id",
-            "hospital_id",
-            "is_active",
             "created_by",
             [("hospital_id", 1), ("is_active", 1)],
             [("is_active", 1), ("priority", -1)]
@@ -238,7 +382,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "trigger_admission",
-                "type": "event",
+                "type": "trigger",
                 "name": "Patient Admission Trigger",
                 "parameters": {"event_type": "patient_admitted"}
             },
@@ -269,7 +413,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "schedule_trigger",
-                "type": "schedule",
+                "type": "trigger",
                 "name": "Daily Medication Check",
                 "parameters": {"cron": "0 */2 * * *"}  # Every 2 hours
             },
@@ -300,7 +444,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "emergency_trigger",
-                "type": "event",
+                "type": "trigger",
                 "name": "Emergency Alert Trigger",
                 "parameters": {"event_type": "emergency_alert"}
             },
@@ -337,7 +481,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "discharge_trigger",
-                "type": "event",
+                "type": "trigger",
                 "name": "Discharge Order Trigger",
                 "parameters": {"event_type": "discharge_ordered"}
             },
@@ -374,7 +518,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "capacity_check_trigger",
-                "type": "schedule",
+                "type": "trigger",
                 "name": "Hourly Capacity Check",
                 "parameters": {"cron": "0 * * * *"}  # Every hour
             },
@@ -417,7 +561,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "vital_signs_trigger",
-                "type": "event",
+                "type": "trigger",
                 "name": "Vital Signs Update Trigger",
                 "parameters": {"event_type": "vital_signs_updated"}
             },
@@ -460,7 +604,7 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
         "nodes": [
             {
                 "id": "appointment_request_trigger",
-                "type": "event",
+                "type": "trigger",
                 "name": "Appointment Request Trigger",
                 "parameters": {"event_type": "appointment_requested"}
             },
@@ -496,4 +640,17 @@ HEALTHCARE_WORKFLOW_TEMPLATES = {
             }
         ]
     }
-}
\ No newline at end of file
+}
+
+# Built-in templates encoded once; they never change at runtime
+HEALTHCARE_WORKFLOW_TEMPLATES_JSON = orjson.dumps(HEALTHCARE_WORKFLOW_TEMPLATES)
+
+# Read-only view so request handlers can't modify the shared templates
+HEALTHCARE_WORKFLOW_TEMPLATES = MappingProxyType(HEALTHCARE_WORKFLOW_TEMPLATES)
+
+# Built-in template nodes validated once; WorkflowNode is frozen, so workflows
+# created from a template can share the instances
+PREBUILT_TEMPLATE_NODES = MappingProxyType({
+    template_id: tuple(WorkflowNode.model_validate(node) for node in template["nodes"])
+    for template_id, template in HEALTHCARE_WORKFLOW_TEMPLATES.items()
+})
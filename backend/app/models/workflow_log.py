@@ -3,9 +3,10 @@ from pydantic import Field
 from typing import Optional
 from datetime import datetime
 from enum import Enum
+from app.utils.clock import utcnow
 
 
-class WorkflowStatus(str, Enum):
+class WorkflowRunStatus(str, Enum):
     """n8n workflow execution status"""
     SUCCESS = "success"
     FAILED = "failed"
@@ -16,16 +17,15 @@ class WorkflowLog(Document):
     """n8n workflow execution log model"""
     workflow_name: str = Field(index=True)
     execution_id: str
-    status: WorkflowStatus = WorkflowStatus.RUNNING
+    status: WorkflowRunStatus = WorkflowRunStatus.RUNNING
     input_data: Optional[dict] = None
     output_data: Optional[dict] = None
     error_message: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    created_at: datetime = Field(default_factory=utcnow, index=True)
     
     class Settings:
         name = "n8n_workflow_logs"
         indexes = [
-            "workflow_name",
             "status",
             "created_at",
             [("workflow_name", 1), ("created_at", -1)]
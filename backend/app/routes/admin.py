@@ -1,40 +1,59 @@
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from app.models.user import User
-from app.models.hospital import Hospital
+from app.models.hospital import Hospital, HospitalCard
+from app.models.hospital_math import occupancy_dicts
 from app.models.patient import Patient
-from app.models.referral import Referral
-from app.models.wallet import Wallet, WalletTransaction
+from app.models.referral import Referral, ReferralStatus
+from app.models.wallet import Wallet, WalletTransaction, PayoutRequest, PayoutStatus
 from app.models.advertisement import Advertisement
 from app.models.workflow_log import WorkflowLog
 from app.middleware.auth import get_admin_user
+from app.services.batch import batch_fetch_by_id, batch_fetch_hospital_names, batch_fetch_wallets_by_hospital
+from app.services.model_cache import model_cache
+from app.services.response_cache import response_cache
+from app.utils.responses import etag_response
 from bson import ObjectId
+from cachetools import TTLCache
 from datetime import datetime, timedelta
 from typing import Optional
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/admin", tags=["Admin"])
 
+# System analytics are expensive and change slowly; admin writes that move
+# the figures (subscriptions, payouts) clear the cache immediately
+_ANALYTICS_CACHE: TTLCache = TTLCache(maxsize=1, ttl=60)
+
 
 @router.get("/hospitals")
 async def list_all_hospitals(
+    request: Request,
     subscription_plan: Optional[str] = None,
     current_user: User = Depends(get_admin_user)
 ):
     """
     List all hospitals with subscription status (admin only)
     """
+    # Encoded listings are cached until a hospital write (Hospital.invalidate_cache)
+    cache_key = ("admin_hospitals", subscription_plan)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, *cached)
+    
     query = {}
     if subscription_plan:
         query["subscription.plan"] = subscription_plan
     
-    hospitals = await Hospital.find(query).to_list()
+    hospitals = await Hospital.find(query, projection_model=HospitalCard).to_list()
     
+    occupancies, _ = occupancy_dicts(h.capacity for h in hospitals)
+    wallets = await batch_fetch_wallets_by_hospital(h.id for h in hospitals)
     result = []
-    for hospital in hospitals:
-        # Get wallet balance
-        wallet = await Wallet.find_one(Wallet.hospital_id == hospital.id)
+    for hospital, occupancy in zip(hospitals, occupancies):
+        wallet = wallets.get(hospital.id)
         
         result.append({
             "id": str(hospital.id),
@@ -45,11 +64,12 @@ async def list_all_hospitals(
             "subscription": hospital.subscription,
             "wallet_balance": wallet.balance if wallet else 0,
             "capacity": hospital.capacity,
-            "occupancy": hospital.get_occupancy_percentage(),
+            "occupancy": occupancy,
             "created_at": hospital.created_at
         })
     
-    return {"hospitals": result, "count": len(result)}
+    body, etag = response_cache.put(cache_key, {"hospitals": result, "count": len(result)})
+    return etag_response(request, body, etag)
 
 
 @router.put("/hospitals/{hospital_id}/subscription")
@@ -70,6 +90,7 @@ async def update_hospital_subscription(
         hospital.subscription.update(subscription_data)
         hospital.updated_at = datetime.utcnow()
         await hospital.save()
+        _ANALYTICS_CACHE.clear()
         
         logger.info(f"Admin updated subscription for hospital {hospital_id}")
         
@@ -82,69 +103,100 @@ async def update_hospital_subscription(
         raise HTTPException(status_code=400, detail=str(e))
 
 
+def _facet_count(stats: dict, name: str) -> int:
+    """Value of a {"$count": "n"} $facet branch, 0 when nothing matched"""
+    return stats[name][0]["n"] if stats[name] else 0
+
+
 @router.get("/analytics")
 async def get_system_analytics(current_user: User = Depends(get_admin_user)):
     """
     Enhanced system-wide analytics dashboard
     """
-    # Count hospitals by subscription
-    total_hospitals = await Hospital.find_all().count()
-    free_hospitals = await Hospital.find(Hospital.subscription_tier == "free").count()
-    paid_hospitals = await Hospital.find(Hospital.subscription_tier == "paid").count()
-    verified_hospitals = await Hospital.find(Hospital.is_verified == True).count()
+    cached = _ANALYTICS_CACHE.get("analytics")
+    if cached is not None:
+        return cached
     
-    # Count patients
-    total_patients = await Patient.find_all().count()
+    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
+    
+    # Hospital figures come from one $facet pass over the collection.
+    # The queries are independent, so they run concurrently
+    (
+        hospital_stats,
+        total_referrals,
+        completed_referrals,
+        pending_referrals,
+        recent_referrals,
+        total_patients,
+        wallet_totals,
+        payout_totals
+    ) = await asyncio.gather(
+        Hospital.get_motor_collection().aggregate([
+            {"$facet": {
+                "total": [{"$count": "n"}],
+                "free": [{"$match": {"subscription.plan": "free"}}, {"$count": "n"}],
+                "verified": [{"$match": {"is_verified": True}}, {"$count": "n"}],
+                "occupancy": [{"$group": {"_id": None, "avg": {"$avg": "$occupancy_avg"}}}],
+                "top_cities": [
+                    {"$group": {"_id": "$city", "n": {"$sum": 1}}},
+                    {"$sort": {"n": -1}},
+                    {"$limit": 10}
+                ],
+                "cities": [{"$group": {"_id": "$city"}}, {"$count": "n"}],
+                "by_state": [{"$group": {"_id": "$state", "n": {"$sum": 1}}}]
+            }}
+        ]).to_list(length=1),
+        # Referral figures are plain filters, so they stay separate counts
+        # that the server answers from the status and created_at indexes
+        Referral.find_all().count(),
+        Referral.find(Referral.status == ReferralStatus.COMPLETED).count(),
+        Referral.find(Referral.status == ReferralStatus.PENDING).count(),
+        Referral.find(Referral.created_at >= thirty_days_ago).count(),
+        Patient.find_all().count(),
+        Wallet.get_motor_collection().aggregate([
+            {"$group": {
+                "_id": None,
+                "balance": {"$sum": "$balance"},
+                "earned": {"$sum": "$total_earned"},
+                "withdrawn": {"$sum": "$total_withdrawn"}
+            }}
+        ]).to_list(length=1),
+        PayoutRequest.get_motor_collection().aggregate([
+            {"$match": {"status": PayoutStatus.PENDING.value}},
+            {"$group": {"_id": None, "count": {"$sum": 1}, "amount": {"$sum": "$amount"}}}
+        ]).to_list(length=1)
+    )
+    hospital_stats = hospital_stats[0]
     
-    # Count referrals by status
-    all_referrals = await Referral.find_all().to_list()
-    total_referrals = len(all_referrals)
-    completed_referrals = sum(1 for r in all_referrals if r.payment_status == "completed")
-    pending_referrals = sum(1 for r in all_referrals if r.payment_status == "pending")
+    # Count hospitals by subscription
+    total_hospitals = _facet_count(hospital_stats, "total")
+    free_hospitals = _facet_count(hospital_stats, "free")
+    paid_hospitals = total_hospitals - free_hospitals
+    verified_hospitals = _facet_count(hospital_stats, "verified")
     
     # Calculate revenue (platform fees from completed referrals)
     total_revenue = completed_referrals * 40  # ₹40 platform fee per referral
     
-    # Get recent activity (last 30 days)
-    thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_referrals = sum(1 for r in all_referrals if r.created_at >= thirty_days_ago)
-    
-    # Get all wallets for total ecosystem value
-    all_wallets = await Wallet.find_all().to_list()
-    total_wallet_balance = sum(w.balance for w in all_wallets)
-    total_earned = sum(w.total_earned for w in all_wallets)
-    total_withdrawn = sum(w.total_withdrawn for w in all_wallets)
-    
-    # Get pending payouts
-    from app.models.wallet import PayoutRequest, PayoutStatus
-    pending_payouts = await PayoutRequest.find(
-        PayoutRequest.status == PayoutStatus.PENDING
-    ).to_list()
-    pending_payout_amount = sum(p.amount for p in pending_payouts)
+    # Total ecosystem value
+    wallet_totals = wallet_totals[0] if wallet_totals else {"balance": 0, "earned": 0, "withdrawn": 0}
+    total_wallet_balance = wallet_totals["balance"]
+    total_earned = wallet_totals["earned"]
+    total_withdrawn = wallet_totals["withdrawn"]
     
-    # Hospital distribution by city
-    all_hospitals = await Hospital.find_all().to_list()
-    city_distribution = {}
-    state_distribution = {}
-    for hospital in all_hospitals:
-        city = hospital.city
-        state = hospital.state
-        if city in city_distribution:
-            city_distribution[city] += 1
-        else:
-            city_distribution[city] = 1
-        if state in state_distribution:
-            state_distribution[state] += 1
-        else:
-            state_distribution[state] = 1
+    # Pending payouts
+    payout_totals = payout_totals[0] if payout_totals else {"count": 0, "amount": 0}
+    pending_payout_count = payout_totals["count"]
+    pending_payout_amount = payout_totals["amount"]
     
-    # Top cities by hospital count
-    top_cities = sorted(city_distribution.items(), key=lambda x: x[1], reverse=True)[:10]
+    # Hospital distribution; only the top 10 cities are returned
+    top_cities = {row["_id"]: row["n"] for row in hospital_stats["top_cities"]}
+    state_distribution = {row["_id"]: row["n"] for row in hospital_stats["by_state"]}
     
-    # Calculate system health metrics
-    avg_occupancy = sum(h.get_occupancy_percentage() for h in all_hospitals) / len(all_hospitals) if all_hospitals else 0
+    # Calculate system health metrics from the denormalized occupancy_avg
+    occupancy = hospital_stats["occupancy"]
+    avg_occupancy = round(occupancy[0]["avg"] or 0, 2) if occupancy else 0
     
-    return {
+    analytics = {
         "overview": {
             "total_hospitals": total_hospitals,
             "verified_hospitals": verified_hospitals,
@@ -178,16 +230,18 @@ async def get_system_analytics(current_user: User = Depends(get_admin_user)):
             "total_balance": round(total_wallet_balance, 2),
             "total_earned": round(total_earned, 2),
             "total_withdrawn": round(total_withdrawn, 2),
-            "pending_payouts": len(pending_payouts),
+            "pending_payouts": pending_payout_count,
             "pending_payout_amount": round(pending_payout_amount, 2)
         },
         "geographic_distribution": {
-            "by_city": dict(top_cities),
+            "by_city": top_cities,
             "by_state": state_distribution,
-            "total_cities": len(city_distribution),
+            "total_cities": _facet_count(hospital_stats, "cities"),
             "total_states": len(state_distribution)
         }
     }
+    _ANALYTICS_CACHE["analytics"] = analytics
+    return analytics
 
 
 @router.post("/advertisements")
@@ -227,19 +281,25 @@ async def create_advertisement(
 
 
 @router.get("/advertisements")
-async def list_advertisements(current_user: User = Depends(get_admin_user)):
+async def list_advertisements(request: Request, current_user: User = Depends(get_admin_user)):
     """
     List all advertisements
     """
+    # Cached until an advertisement or hospital write; metric counters
+    # bypass the hooks and refresh when the entry expires
+    cache_key = ("admin_advertisements",)
+    cached = response_cache.get(cache_key)
+    if cached is not None:
+        return etag_response(request, *cached)
+    
     ads = await Advertisement.find_all().to_list()
+    hospital_names = await batch_fetch_hospital_names(ad.hospital_id for ad in ads)
     
     result = []
     for ad in ads:
-        hospital = await Hospital.get(ad.hospital_id)
-        
         result.append({
             "id": str(ad.id),
-            "hospital_name": hospital.name if hospital else "Unknown",
+            "hospital_name": hospital_names.get(ad.hospital_id) or "Unknown",
             "hospital_id": str(ad.hospital_id),
             "title": ad.title,
             "description": ad.description,
@@ -249,7 +309,8 @@ async def list_advertisements(current_user: User = Depends(get_admin_user)):
             "created_at": ad.created_at
         })
     
-    return {"advertisements": result}
+    body, etag = response_cache.put(cache_key, {"advertisements": result})
+    return etag_response(request, body, etag)
 
 
 @router.put("/advertisements/{ad_id}")
@@ -288,18 +349,22 @@ async def get_all_wallet_transactions(
     """
     Get all wallet transactions across the platform
     """
+    # Newest first by _id, which is assigned at insert like created_at
     transactions = await WalletTransaction.find_all().sort(
-        -WalletTransaction.created_at
+        -WalletTransaction.id
     ).limit(limit).to_list()
     
+    wallets = await batch_fetch_by_id(Wallet, (t.wallet_id for t in transactions))
+    hospital_names = await batch_fetch_hospital_names(w.hospital_id for w in wallets.values())
+    
     result = []
     for t in transactions:
-        wallet = await Wallet.get(t.wallet_id)
-        hospital = await Hospital.find_one(Wallet.hospital_id == wallet.hospital_id) if wallet else None
+        wallet = wallets.get(t.wallet_id)
+        hospital_name = hospital_names.get(wallet.hospital_id) if wallet else None
         
         result.append({
             "id": str(t.id),
-            "hospital_name": hospital.name if hospital else "Unknown",
+            "hospital_name": hospital_name or "Unknown",
             "type": t.transaction_type,
             "amount": t.amount,
             "description": t.description,
@@ -321,15 +386,18 @@ async def get_pending_payouts(current_user: User = Depends(get_admin_user)):
             PayoutRequest.status == PayoutStatus.PENDING
         ).sort("-requested_at").to_list()
         
+        hospital_ids = [payout.hospital_id for payout in pending_payouts]
+        hospital_names = await batch_fetch_hospital_names(hospital_ids)
+        wallets = await batch_fetch_wallets_by_hospital(hospital_ids)
+        
         result = []
         for payout in pending_payouts:
-            hospital = await Hospital.get(payout.hospital_id)
-            wallet = await Wallet.find_one(Wallet.hospital_id == payout.hospital_id)
+            wallet = wallets.get(payout.hospital_id)
             
             result.append({
                 "id": str(payout.id),
                 "hospital_id": str(payout.hospital_id),
-                "hospital_name": hospital.name if hospital else "Unknown",
+                "hospital_name": hospital_names.get(payout.hospital_id) or "Unknown",
                 "amount": payout.amount,
                 "wallet_balance": wallet.balance if wallet else 0,
                 "account_holder": payout.account_holder_name,
@@ -379,8 +447,11 @@ async def approve_payout(
         if not wallet or wallet.balance < payout.amount:
             raise HTTPException(status_code=400, detail="Insufficient wallet balance")
         
-        # Deduct from wallet
-        await wallet.debit(payout.amount)
+        # Deduct from wallet; the balance is re-checked atomically
+        try:
+            await wallet.debit(payout.amount)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         # Create transaction record
         transaction = WalletTransaction(
@@ -396,8 +467,9 @@ async def approve_payout(
         payout.processed_at = datetime.utcnow()
         payout.admin_notes = admin_notes
         await payout.save()
+        _ANALYTICS_CACHE.clear()
         
-        hospital = await Hospital.get(payout.hospital_id)
+        hospital = await model_cache.get(Hospital, payout.hospital_id)
         
         logger.info(f"Admin approved payout {payout_id} of ₹{payout.amount}")
         
@@ -444,8 +516,9 @@ async def reject_payout(
         payout.processed_at = datetime.utcnow()
         payout.admin_notes = admin_notes
         await payout.save()
+        _ANALYTICS_CACHE.clear()
         
-        hospital = await Hospital.get(payout.hospital_id)
+        hospital = await model_cache.get(Hospital, payout.hospital_id)
         
         logger.info(f"Admin rejected payout {payout_id}")
         
@@ -2,8 +2,11 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 from app.models.advertisement import Advertisement, AdStatus
 from app.models.hospital import Hospital
+from app.services.model_cache import model_cache
+from app.services.batch import batch_fetch_hospital_names
 from app.models.user import User
 from app.middleware.auth import get_hospital_user, get_admin_user
+from app.services.increment_buffer import ad_metrics_buffer
 from bson import ObjectId
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -313,15 +316,14 @@ async def display_advertisements(
         # Simple randomization for ad rotation
         random.shuffle(ads)
         
-        # Increment impressions
+        # Increment impressions (batched $inc, flushed in the background)
         for ad in ads[:limit]:
-            ad.impressions += 1
-            await ad.save()
+            ad_metrics_buffer.add(ad.id, "impressions")
         
         # Format response
         result = []
         for ad in ads[:limit]:
-            hospital = await Hospital.get(ad.hospital_id)
+            hospital = await model_cache.get(Hospital, ad.hospital_id)
             result.append({
                 "id": str(ad.id),
                 "title": ad.title,
@@ -346,7 +348,12 @@ async def track_ad_click(ad_id: str):
     Track ad click and redirect to target URL
     """
     try:
-        ad = await Advertisement.get(ObjectId(ad_id))
+        # Count the click and fetch the target URL in one atomic round-trip
+        ad = await Advertisement.get_motor_collection().find_one_and_update(
+            {"_id": ObjectId(ad_id)},
+            {"$inc": {"clicks": 1}},
+            projection={"link_url": 1}
+        )
         
         if not ad:
             raise HTTPException(
@@ -354,13 +361,10 @@ async def track_ad_click(ad_id: str):
                 detail="Ad not found"
             )
         
-        ad.clicks += 1
-        await ad.save()
-        
         # Redirect to the ad's link URL
-        if ad.link_url:
+        if ad.get("link_url"):
             from fastapi.responses import RedirectResponse
-            return RedirectResponse(url=ad.link_url)
+            return RedirectResponse(url=ad["link_url"])
         
         return {"message": "Ad click tracked, but no redirect URL provided."}
         
@@ -386,14 +390,15 @@ async def get_pending_ads(admin_user: dict = Depends(get_admin_user)):
             Advertisement.status == AdStatus.PENDING_REVIEW
         ).to_list()
         
+        hospital_names = await batch_fetch_hospital_names(ad.hospital_id for ad in pending_ads)
+        
         result = []
         for ad in pending_ads:
-            hospital = await Hospital.get(ad.hospital_id)
             result.append({
                 "id": str(ad.id),
                 "title": ad.title,
                 "description": ad.description,
-                "hospital_name": hospital.name if hospital else "Unknown",
+                "hospital_name": hospital_names.get(ad.hospital_id) or "Unknown",
                 "created_at": ad.created_at.isoformat()
             })
         
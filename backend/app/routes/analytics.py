@@ -1,18 +1,23 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from datetime import datetime, timedelta
-from app.models.analytics import Analytics, HealthAlert, PatientOutcome, AnalyticsType
+from app.models.analytics import Analytics, HealthAlert, PatientOutcome, PatientOutcomeCard, AnalyticsType
 from app.models.hospital import Hospital
 from app.models.patient import Patient
 from app.models.referral import Referral
 from app.models.appointment import Appointment
-from app.middleware.auth import get_current_user, require_role
+from app.middleware.auth import get_current_user, require_role, user_hospital_id
 from app.models.user import User
 from app.services.ai_service import AIService
+from app.utils.responses import ModelJSONResponse
 import uuid
 
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
+# Alert target types resolved at read time. Global alerts carry no target_ids;
+# regional alerts are matched by city or region and may also list target_ids
+BROADCAST_TARGET_TYPES = ("global", "regional")
+
 @router.get("/dashboard")
 async def get_dashboard_analytics(
     period_days: int = Query(30, description="Analysis period in days"),
@@ -106,44 +111,58 @@ async def get_health_alerts(
         if alert_type:
             query["alert_type"] = alert_type
             
-        # Filter based on user role
+        # Filter based on user role. Broadcast alerts are matched by target_type,
+        # and regional ones by the hospital's city, or its state when no city is set
         if current_user.role == "hospital":
-            hospital_id = current_user.hospital_id or current_user.id
-            # Get alerts relevant to this hospital
-            alerts = await HealthAlert.find(
-                HealthAlert.target_ids.in_([hospital_id]) | 
-                (HealthAlert.target_type == "global")
-            ).sort(-HealthAlert.issued_at).to_list()
+            hospital_id = user_hospital_id(current_user)
+            targets = [{"target_ids": str(hospital_id)}, {"target_type": "global"}]
+            hospital = await Hospital.get(hospital_id)
+            if hospital:
+                targets.append({"target_type": "regional", "city": hospital.city})
+                targets.append({"target_type": "regional", "city": None, "region": hospital.state})
+            query["$or"] = targets
         elif current_user.role == "patient":
-            # Get alerts relevant to this patient
-            alerts = await HealthAlert.find(
-                HealthAlert.target_ids.in_([current_user.id]) | 
-                (HealthAlert.target_type.in_(["global", "regional"]))
-            ).sort(-HealthAlert.issued_at).to_list()
-        else:
-            # Admin sees all alerts
-            alerts = await HealthAlert.find().sort(-HealthAlert.issued_at).to_list()
+            query["$or"] = [
+                {"target_ids": str(current_user.id)},
+                {"target_type": {"$in": list(BROADCAST_TARGET_TYPES)}}
+            ]
+        
+        # Admins get no target filter
+        alerts = await HealthAlert.find(query).sort(-HealthAlert.issued_at).to_list()
             
-        return {"alerts": alerts}
+        return ModelJSONResponse({"alerts": alerts})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/health-alerts", dependencies=[Depends(require_role(["admin", "hospital"]))])
+@router.post("/health-alerts", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def create_health_alert(
     alert_data: dict,
     current_user: User = Depends(get_current_user)
 ):
     """Create a new health alert"""
     try:
+        target_type = alert_data["target_type"]
+        target_ids = [] if target_type == "global" else alert_data.get("target_ids", [])
+        if (
+            target_type == "regional"
+            and not alert_data.get("city")
+            and not alert_data.get("region")
+            and not target_ids
+        ):
+            raise HTTPException(
+                status_code=400,
+                detail="Regional alerts need a city, a region or target_ids"
+            )
+        
         alert = HealthAlert(
             alert_id=str(uuid.uuid4()),
             alert_type=alert_data["alert_type"],
             severity=alert_data["severity"],
             title=alert_data["title"],
             message=alert_data["message"],
-            target_type=alert_data["target_type"],
-            target_ids=alert_data.get("target_ids", []),
+            target_type=target_type,
+            target_ids=target_ids,
             region=alert_data.get("region"),
             city=alert_data.get("city"),
             coordinates=alert_data.get("coordinates"),
@@ -157,8 +176,10 @@ async def create_health_alert(
         
         # TODO: Implement alert broadcasting to affected users
         
-        return {"alert": alert, "message": "Health alert created successfully"}
+        return ModelJSONResponse({"alert": alert, "message": "Health alert created successfully"})
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -186,7 +207,9 @@ async def get_patient_outcomes(
         if outcome_type:
             query = query & (PatientOutcome.outcome_type == outcome_type)
             
-        outcomes = await PatientOutcome.find(query).sort(-PatientOutcome.admission_date).to_list()
+        outcomes = await PatientOutcome.find(
+            query, projection_model=PatientOutcomeCard
+        ).sort(-PatientOutcome.admission_date).to_list()
         
         # Calculate summary statistics
         total_outcomes = len(outcomes)
@@ -197,7 +220,7 @@ async def get_patient_outcomes(
         for outcome in outcomes:
             outcome_distribution[outcome.outcome_type] = outcome_distribution.get(outcome.outcome_type, 0) + 1
             
-        return {
+        return ModelJSONResponse({
             "summary": {
                 "total_outcomes": total_outcomes,
                 "readmission_rate_30d": (readmission_30d / max(1, total_outcomes)) * 100,
@@ -205,12 +228,12 @@ async def get_patient_outcomes(
                 "outcome_distribution": outcome_distribution
             },
             "outcomes": outcomes
-        }
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/patient-outcomes", dependencies=[Depends(require_role(["hospital"]))])
+@router.post("/patient-outcomes", dependencies=[Depends(require_role(("hospital",)))])
 async def create_patient_outcome(
     outcome_data: dict,
     current_user: User = Depends(get_current_user)
@@ -243,7 +266,7 @@ async def create_patient_outcome(
             
         await outcome.create()
         
-        return {"outcome": outcome, "message": "Patient outcome recorded successfully"}
+        return ModelJSONResponse({"outcome": outcome, "message": "Patient outcome recorded successfully"})
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
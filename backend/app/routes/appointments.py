@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 from app.models.appointment import Appointment, AppointmentStatus, AppointmentType
 from app.models.hospital import Hospital
+from app.services.batch import batch_fetch_hospital_names
 from app.models.notification import Notification, NotificationType
 from app.models.user import User
 from app.middleware.auth import get_patient_user, get_hospital_user
@@ -100,12 +101,13 @@ async def get_my_appointments(
             Appointment.patient_id == ObjectId(current_user.profile_id)
         ).sort("-scheduled_time").to_list()
         
+        hospital_names = await batch_fetch_hospital_names(apt.hospital_id for apt in appointments)
+        
         result = []
         for apt in appointments:
-            hospital = await Hospital.get(apt.hospital_id)
             result.append({
                 "id": str(apt.id),
-                "hospital_name": hospital.name if hospital else "Unknown",
+                "hospital_name": hospital_names.get(apt.hospital_id) or "Unknown",
                 "specialization": apt.specialization,
                 "appointment_type": apt.appointment_type,
                 "scheduled_time": apt.scheduled_time.isoformat(),
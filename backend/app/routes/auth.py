@@ -11,8 +11,8 @@ from app.models.hospital import Hospital
 from app.models.patient import Patient
 from app.models.wallet import Wallet
 from app.utils.validators import hash_password, verify_password
-from app.utils.jwt import create_access_token
-from app.middleware.auth import get_current_user
+from app.utils.jwt import create_access_token, create_demo_token, DEMO_USER_ID
+from app.middleware.auth import get_current_user, invalidate_user
 from datetime import datetime
 import logging
 from app.database import db
@@ -116,10 +116,10 @@ async def login(request: UserLoginRequest):
         if settings.demo_auth_enabled:
             if request.email == settings.demo_user_email and request.password == settings.demo_user_password:
                 # Return a synthetic token and minimal user info
-                access_token = create_access_token(data={"sub": "demo-user-id", "role": UserRole.PATIENT.value})
+                access_token = create_demo_token()
                 return AuthResponse(
                     user=UserResponse(
-                        id="demo-user-id",
+                        id=DEMO_USER_ID,
                         email=settings.demo_user_email,
                         role=UserRole.PATIENT.value,
                         is_active=True
@@ -156,6 +156,7 @@ async def login(request: UserLoginRequest):
     # Update last login
     user.updated_at = datetime.utcnow()
     await user.save()
+    invalidate_user(user.id)
     
     # Generate access token
     access_token = create_access_token(
@@ -182,9 +183,9 @@ async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """
     if not db.connected:
         # Demo auth fallback: return synthetic profile for demo user
-        if settings.demo_auth_enabled and hasattr(current_user, 'id') and str(current_user.id) == "demo-user-id":
+        if settings.demo_auth_enabled and hasattr(current_user, 'id') and str(current_user.id) == DEMO_USER_ID:
             return {
-                "id": "demo-user-id",
+                "id": DEMO_USER_ID,
                 "email": settings.demo_user_email,
                 "role": UserRole.PATIENT.value,
                 "is_active": True,
@@ -3,6 +3,7 @@ from pydantic import BaseModel
 from app.models.hospital import Hospital
 from app.models.capacity_log import CapacityLog
 from app.middleware.auth import get_hospital_user
+from app.services.insert_buffer import capacity_log_buffer
 from bson import ObjectId
 from datetime import datetime, timedelta
 import logging
@@ -87,7 +88,7 @@ async def update_capacity(
             ventilators_occupied=hospital.capacity['ventilators'] - hospital.capacity['available_ventilators'],
             timestamp=datetime.utcnow()
         )
-        await capacity_log.insert()
+        capacity_log_buffer.add(capacity_log)
         
         logger.info(f"Capacity updated for hospital {hospital_id}")
         
@@ -275,7 +276,7 @@ async def quick_capacity_update(
             ventilators_occupied=hospital.capacity['ventilators'] - hospital.capacity['available_ventilators'],
             timestamp=datetime.utcnow()
         )
-        await capacity_log.insert()
+        capacity_log_buffer.add(capacity_log)
         
         return {
             "message": "Capacity updated successfully",
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from app.models.user import User, UserRole
 from app.models.hospital import Hospital
+from app.models.hospital_math import occupancy_dicts
 from app.models.inventory import Inventory
 from app.models.referral import Referral, ReferralStatus
 from app.models.surge_prediction import SurgePrediction
@@ -64,10 +65,13 @@ async def execute_agentic_action(
 async def list_hospitals(
     city: Optional[str] = None,
     specialization: Optional[str] = None,
-    has_beds: Optional[bool] = None
+    has_beds: Optional[bool] = None,
+    load_probability: Optional[str] = None
 ):
     """
     List all hospitals with optional filters
+    
+    Filtering by load_probability returns the least occupied hospitals first.
     """
     query = {}
     
@@ -80,11 +84,16 @@ async def list_hospitals(
     if has_beds:
         query["capacity.available_beds"] = {"$gt": 0}
     
-    hospitals = await Hospital.find(query).to_list()
+    if load_probability:
+        query["load_probability"] = load_probability
+        hospitals = await Hospital.find(query).sort("occupancy_avg").to_list()
+    else:
+        hospitals = await Hospital.find(query).to_list()
     
-    # Add occupancy data
+    # Add occupancy data, computed for all hospitals in one batch
+    occupancies, load_probabilities = occupancy_dicts(h.capacity for h in hospitals)
     result = []
-    for hospital in hospitals:
+    for hospital, occupancy, load_probability in zip(hospitals, occupancies, load_probabilities):
         result.append({
             "id": str(hospital.id),
             "name": hospital.name,
@@ -94,8 +103,8 @@ async def list_hospitals(
             "phone": hospital.phone,
             "specializations": hospital.specializations,
             "capacity": hospital.capacity,
-            "occupancy": hospital.get_occupancy_percentage(),
-            "load_probability": hospital.get_load_probability(),
+            "occupancy": occupancy,
+            "load_probability": load_probability,
             "subscription_plan": hospital.subscription.get("plan", "free")
         })
     
@@ -1,15 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, Query
 from typing import List, Optional
 from datetime import datetime, timedelta, time
-from app.models.medication import Medication, MedicationReminder, Prescription, MedicationStatus, MedicationFrequency
+from app.models.medication import Medication, MedicationCard, MedicationReminder, Prescription, MedicationStatus, MedicationFrequency
 from app.models.notification import Notification
-from app.middleware.auth import get_current_user, require_role
+from app.middleware.auth import get_current_user, require_role, user_hospital_id
 from app.models.user import User
+from beanie import PydanticObjectId as ObjectId
 import uuid
 
 router = APIRouter(prefix="/api/medications", tags=["medications"])
 
-@router.post("/prescriptions", dependencies=[Depends(require_role(["hospital", "admin"]))])
+@router.post("/prescriptions", dependencies=[Depends(require_role(("hospital", "admin")))])
 async def create_prescription(
     prescription_data: dict,
     current_user: User = Depends(get_current_user)
@@ -22,7 +23,7 @@ async def create_prescription(
         # Create prescription
         prescription = Prescription(
             patient_id=prescription_data["patient_id"],
-            hospital_id=current_user.hospital_id or current_user.id,
+            hospital_id=user_hospital_id(current_user),
             doctor_id=current_user.id,
             prescription_number=prescription_number,
             diagnosis=prescription_data.get("diagnosis"),
@@ -37,7 +38,7 @@ async def create_prescription(
         for med_data in prescription_data["medications"]:
             medication = Medication(
                 patient_id=prescription_data["patient_id"],
-                hospital_id=current_user.hospital_id or current_user.id,
+                hospital_id=user_hospital_id(current_user),
                 prescribed_by=current_user.id,
                 name=med_data["name"],
                 generic_name=med_data.get("generic_name"),
@@ -86,7 +87,7 @@ async def create_prescription(
 
 @router.get("/prescriptions")
 async def get_prescriptions(
-    patient_id: Optional[str] = Query(None),
+    patient_id: Optional[ObjectId] = Query(None),
     current_user: User = Depends(get_current_user)
 ):
     """Get prescriptions for patient or doctor"""
@@ -98,7 +99,7 @@ async def get_prescriptions(
         elif current_user.role == "hospital" and patient_id:
             prescriptions = await Prescription.find(
                 Prescription.patient_id == patient_id,
-                Prescription.hospital_id == current_user.hospital_id or current_user.id
+                Prescription.hospital_id == user_hospital_id(current_user)
             ).sort(-Prescription.created_at).to_list()
         else:
             prescriptions = await Prescription.find(
@@ -112,7 +113,7 @@ async def get_prescriptions(
 
 @router.get("/patient/{patient_id}")
 async def get_patient_medications(
-    patient_id: str,
+    patient_id: ObjectId,
     status: Optional[MedicationStatus] = Query(None),
     current_user: User = Depends(get_current_user)
 ):
@@ -126,7 +127,9 @@ async def get_patient_medications(
         if status:
             query = query & (Medication.status == status)
             
-        medications = await Medication.find(query).sort(-Medication.created_at).to_list()
+        medications = await Medication.find(
+            query, projection_model=MedicationCard
+        ).sort(-Medication.created_at).to_list()
         
         return {"medications": medications}
         
@@ -226,7 +229,7 @@ async def update_medication_status(
 
 @router.get("/adherence/{patient_id}")
 async def get_medication_adherence(
-    patient_id: str,
+    patient_id: ObjectId,
     days: int = Query(30, description="Number of days to analyze"),
     current_user: User = Depends(get_current_user)
 ):
@@ -277,7 +280,7 @@ async def get_medication_adherence(
             overall_adherence = overall_adherence / len(adherence_stats)
         
         return {
-            "patient_id": patient_id,
+            "patient_id": str(patient_id),
             "analysis_period_days": days,
             "overall_adherence_percentage": round(overall_adherence, 2),
             "medication_adherence": adherence_stats
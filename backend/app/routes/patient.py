@@ -3,6 +3,7 @@ from typing import Optional
 from app.models.user import User
 from app.models.patient import Patient
 from app.models.hospital import Hospital
+from app.services.batch import batch_fetch_hospital_names
 from app.models.referral import Referral, ReferralStatus
 from app.middleware.auth import get_patient_user
 from app.services.payment_service import payment_service
@@ -322,15 +323,16 @@ async def get_patient_referrals(current_user: User = Depends(get_patient_user)):
         Referral.patient_id == patient.id
     ).sort(-Referral.created_at).to_list()
     
+    hospital_names = await batch_fetch_hospital_names(
+        hospital_id for r in referrals for hospital_id in (r.from_hospital_id, r.to_hospital_id)
+    )
+    
     result = []
     for r in referrals:
-        from_hospital = await Hospital.get(r.from_hospital_id)
-        to_hospital = await Hospital.get(r.to_hospital_id)
-        
         result.append({
             "id": str(r.id),
-            "from_hospital": from_hospital.name if from_hospital else "Unknown",
-            "to_hospital": to_hospital.name if to_hospital else "Unknown",
+            "from_hospital": hospital_names.get(r.from_hospital_id) or "Unknown",
+            "to_hospital": hospital_names.get(r.to_hospital_id) or "Unknown",
             "status": r.status,
             "reason": r.reason,
             "payment_amount": r.payment["patient_amount"],
@@ -2,6 +2,7 @@ from fastapi import APIRouter, HTTPException, status, Depends
 from pydantic import BaseModel
 from app.models.referral import Referral, ReferralStatus
 from app.models.hospital import Hospital
+from app.services.model_cache import model_cache
 from app.models.patient import Patient
 from app.models.user import User
 from app.models.wallet import Wallet, WalletTransaction, TransactionType
@@ -192,22 +193,23 @@ async def verify_payment(
         destination_amount = (hospital_share * destination_split) / 100
         source_amount = hospital_share - destination_amount
         
-        # Credit wallets
-        await wallet_service.credit_wallet(
-            referral.destination_hospital_id,
-            destination_amount,
-            TransactionType.REFERRAL_EARNING,
-            f"Referral from {source_hospital.name}",
-            str(referral.id)
-        )
-        
-        await wallet_service.credit_wallet(
-            referral.source_hospital_id,
-            source_amount,
-            TransactionType.REFERRAL_EARNING,
-            f"Referral to {destination_hospital.name}",
-            str(referral.id)
-        )
+        # Credit wallets, logging both transactions in one write
+        await wallet_service.credit_wallets([
+            {
+                "hospital_id": referral.destination_hospital_id,
+                "amount": destination_amount,
+                "transaction_type": TransactionType.REFERRAL_EARNING,
+                "description": f"Referral from {source_hospital.name}",
+                "referral_id": str(referral.id)
+            },
+            {
+                "hospital_id": referral.source_hospital_id,
+                "amount": source_amount,
+                "transaction_type": TransactionType.REFERRAL_EARNING,
+                "description": f"Referral to {destination_hospital.name}",
+                "referral_id": str(referral.id)
+            }
+        ])
         
         logger.info(f"Payment verified for referral {referral.id}. " +
                    f"Destination: ₹{destination_amount:.2f}, Source: ₹{source_amount:.2f}")
@@ -261,8 +263,8 @@ async def get_my_referrals(
         
         result = []
         for ref in referrals:
-            source = await Hospital.get(ref.source_hospital_id)
-            destination = await Hospital.get(ref.destination_hospital_id)
+            source = await model_cache.get(Hospital, ref.source_hospital_id)
+            destination = await model_cache.get(Hospital, ref.destination_hospital_id)
             
             result.append({
                 "id": str(ref.id),
@@ -324,7 +326,7 @@ async def get_hospital_referrals(
         for ref in referrals:
             patient = await Patient.get(ref.patient_id)
             other_hospital_id = ref.source_hospital_id if referral_type == "incoming" else ref.destination_hospital_id
-            other_hospital = await Hospital.get(other_hospital_id)
+            other_hospital = await model_cache.get(Hospital, other_hospital_id)
             
             result.append({
                 "id": str(ref.id),
@@ -1,5 +1,6 @@
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from app.models.hospital import Hospital
+from app.models.hospital_math import occupancy_dicts
 from app.middleware.auth import get_current_user
 from typing import Optional, List
 from bson import ObjectId
@@ -257,10 +258,11 @@ async def get_nearby_hospitals_simple(
             Hospital.city == city
         ).to_list()
         
+        hospitals = hospitals[:limit]
+        occupancies, _ = occupancy_dicts(h.capacity for h in hospitals)
         results = []
         
-        for hospital in hospitals[:limit]:
-            occupancy = hospital.get_occupancy_percentage()
+        for hospital, occupancy in zip(hospitals, occupancies):
             available_beds = hospital.capacity.get('available_beds', 0)
             
             results.append({
@@ -297,14 +299,11 @@ async def get_all_specializations():
     Get list of all available specializations
     """
     try:
-        hospitals = await Hospital.find_all().to_list()
-        
-        specializations = set()
-        for hospital in hospitals:
-            specializations.update(hospital.specializations)
+        # Let MongoDB collect the distinct values instead of loading every hospital
+        specializations = await Hospital.distinct("specializations")
         
         return {
-            "specializations": sorted(list(specializations)),
+            "specializations": sorted(specializations),
             "count": len(specializations)
         }
         
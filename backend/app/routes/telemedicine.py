@@ -1,11 +1,16 @@
 from fastapi import APIRouter, HTTPException, Depends, WebSocket, WebSocketDisconnect
 from typing import List, Optional, Dict
 from datetime import datetime, timedelta
-from app.models.telemedicine import TelemedicineSession, IoTDevice, HealthData, EmergencyAlert
+from app.models.telemedicine import TelemedicineSession, IoTDevice, HealthData, EmergencyAlert, VitalSign, VitalBlock
 from app.models.appointment import Appointment
 from app.models.notification import Notification
-from app.middleware.auth import get_current_user
+from app.middleware.auth import get_current_user, user_hospital_id, user_profile_id
 from app.models.user import User
+from app.models.packed import unpack
+from app.utils.clock import utcnow
+from app.services.health_rollup_service import health_rollup_service
+from app.utils.responses import ModelJSONResponse
+import numpy as np
 import uuid
 import json
 
@@ -54,9 +59,10 @@ async def create_telemedicine_session(
             raise HTTPException(status_code=404, detail="Appointment not found")
         
         # Verify user can create session
-        if current_user.role == "patient" and current_user.id != appointment.patient_id:
+        # Appointments reference the patient profile and the hospital, not the user
+        if current_user.role == "patient" and user_profile_id(current_user) != appointment.patient_id:
             raise HTTPException(status_code=403, detail="Access denied")
-        elif current_user.role == "hospital" and current_user.id != appointment.hospital_id:
+        elif current_user.role == "hospital" and user_hospital_id(current_user) != appointment.hospital_id:
             raise HTTPException(status_code=403, detail="Access denied")
         
         # Generate session details
@@ -105,8 +111,8 @@ async def get_telemedicine_session(
         if not session:
             raise HTTPException(status_code=404, detail="Session not found")
         
-        # Verify access
-        if (current_user.role == "patient" and current_user.id != session.patient_id) or \
+        # Verify access; sessions reference the patient profile like appointments
+        if (current_user.role == "patient" and user_profile_id(current_user) != session.patient_id) or \
            (current_user.role == "hospital" and current_user.id != session.doctor_id):
             raise HTTPException(status_code=403, detail="Access denied")
         
@@ -130,7 +136,7 @@ async def start_telemedicine_session(
             raise HTTPException(status_code=404, detail="Session not found")
         
         session.status = "active"
-        session.actual_start = datetime.utcnow()
+        session.actual_start = utcnow()
         await session.save()
         
         return {
@@ -158,7 +164,7 @@ async def end_telemedicine_session(
             raise HTTPException(status_code=404, detail="Session not found")
         
         session.status = "completed"
-        session.ended_at = datetime.utcnow()
+        session.ended_at = utcnow()
         session.consultation_notes = session_data.get("consultation_notes")
         session.prescriptions_issued = session_data.get("prescriptions_issued", [])
         session.follow_up_required = session_data.get("follow_up_required", False)
@@ -252,7 +258,9 @@ async def submit_health_data(
         data_record = HealthData(
             device_id=device_id,
             patient_id=device.patient_id,
-            vital_signs=health_data.get("vital_signs", []),
+            blocks=VitalBlock.from_vital_signs(
+                [VitalSign.model_validate(v) for v in health_data.get("vital_signs", [])]
+            ),
             raw_data=health_data.get("raw_data", {}),
             recorded_at=datetime.fromisoformat(health_data["recorded_at"]),
             activity_context=health_data.get("activity_context"),
@@ -265,9 +273,10 @@ async def submit_health_data(
         data_record.alerts_triggered = alerts_triggered
         
         await data_record.create()
+        await health_rollup_service.record(data_record)
         
         # Update device last sync
-        device.last_sync = datetime.utcnow()
+        device.last_sync = data_record.received_at
         await device.save()
         
         # Send real-time updates to connected clients
@@ -277,7 +286,7 @@ async def submit_health_data(
                 "device_id": device_id,
                 "data": health_data
             }),
-            device.patient_id
+            str(device.patient_id)
         )
         
         return {
@@ -301,18 +310,51 @@ async def get_health_data(
         
         start_date = datetime.utcnow() - timedelta(days=days)
         
-        query = HealthData.patient_id == current_user.id
-        query = query & (HealthData.recorded_at >= start_date)
+        query = {"patient_id": current_user.id, "recorded_at": {"$gte": start_date}}
         
         if device_id:
-            query = query & (HealthData.device_id == device_id)
+            query["device_id"] = device_id
         
-        health_data = await HealthData.find(query).sort(
-            -HealthData.recorded_at
-        ).to_list()
+        # Stored readings were validated on ingest, so the raw documents are
+        # returned as-is instead of being re-validated into HealthData models
+        health_data = await HealthData.get_motor_collection().find(query).sort(
+            "recorded_at", -1
+        ).to_list(length=None)
+        for record in health_data:
+            record["raw_data"] = unpack(record.get("raw_data", {}))
+            record["processed_data"] = unpack(record.get("processed_data", {}))
+        
+        return ModelJSONResponse({"health_data": health_data})
+        
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/health-data/rollups")
+async def get_health_data_rollups(
+    parameter: Optional[str] = None,
+    days: int = 7,
+    window_hours: int = 1,
+    current_user: User = Depends(get_current_user)
+):
+    """Get hourly (or wider) vital sign aggregates for patient"""
+    try:
+        if current_user.role != "patient":
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        if window_hours < 1 or 24 % window_hours:
+            raise HTTPException(status_code=400, detail="window_hours must divide 24")
+        
+        rollups = await health_rollup_service.get_rollups(
+            patient_id=current_user.id,
+            start_date=utcnow() - timedelta(days=days),
+            parameter=parameter,
+            window_hours=window_hours
+        )
         
-        return {"health_data": health_data}
+        return {"rollups": rollups, "window_hours": window_hours}
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -372,6 +414,38 @@ async def get_emergency_alerts(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/emergency-alerts/nearby")
+async def get_nearby_emergency_alerts(
+    latitude: float,
+    longitude: float,
+    radius_km: float = 10,
+    current_user: User = Depends(get_current_user)
+):
+    """Get active emergency alerts near a location, nearest first"""
+    try:
+        if current_user.role == "patient":
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        alerts = await EmergencyAlert.find({
+            "status": "active",
+            "coordinates": {
+                "$near": {
+                    "$geometry": {
+                        "type": "Point",
+                        "coordinates": [longitude, latitude]
+                    },
+                    "$maxDistance": radius_km * 1000
+                }
+            }
+        }).to_list()
+        
+        return {"alerts": alerts}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 # Helper functions
 async def send_session_notifications(session: TelemedicineSession):
     """Send notifications about telemedicine session"""
@@ -412,17 +486,15 @@ async def check_health_data_alerts(data_record: HealthData, device: IoTDevice):
     alerts_triggered = []
     
     try:
-        for vital_sign in data_record.vital_signs:
-            # Check against device alert rules
-            for rule in device.alert_rules:
-                if rule.parameter == vital_sign.type:
-                    if rule.condition == "greater_than" and vital_sign.value > rule.threshold_value:
-                        alerts_triggered.append(rule.alert_message)
-                    elif rule.condition == "less_than" and vital_sign.value < rule.threshold_value:
-                        alerts_triggered.append(rule.alert_message)
-                    elif rule.condition == "between" and rule.threshold_max:
-                        if not (rule.threshold_value <= vital_sign.value <= rule.threshold_max):
-                            alerts_triggered.append(rule.alert_message)
+        for block in data_record.blocks:
+            rules = [rule for rule in device.alert_rules if rule.parameter == block.parameter]
+            if not rules or not block.values:
+                continue
+            # Check all readings of the block against each device alert rule
+            values = np.asarray(block.values, dtype=np.float64)
+            for rule in rules:
+                if rule.evaluate_batch(values).any() and rule.alert_message not in alerts_triggered:
+                    alerts_triggered.append(rule.alert_message)
         
         # Create emergency alert for critical values
         critical_alerts = [a for a in device.alert_rules if a.severity == "high" and a.alert_message in alerts_triggered]
@@ -435,9 +507,10 @@ async def check_health_data_alerts(data_record: HealthData, device: IoTDevice):
                 alert_type="vital_sign_critical",
                 severity="high",
                 message=f"Critical vital signs detected: {', '.join([a.alert_message for a in critical_alerts])}",
-                vital_signs_at_trigger={vs.type: vs.value for vs in data_record.vital_signs}
+                vital_signs_at_trigger={b.parameter: b.values[-1] for b in data_record.blocks if b.values}
             )
             await emergency_alert.create()
+            await trigger_emergency_response(emergency_alert)
             
     except Exception as e:
         print(f"Error checking health data alerts: {e}")
@@ -475,7 +548,7 @@ async def trigger_emergency_response(alert: EmergencyAlert):
                     "message": alert.message
                 }
             }),
-            alert.patient_id
+            str(alert.patient_id)
         )
         
     except Exception as e:
@@ -4,8 +4,8 @@ from app.models.wallet import Wallet, WalletTransaction, TransactionType, Payout
 from app.models.hospital import Hospital
 from app.middleware.auth import get_hospital_user
 from app.models.user import User
+from app.utils.clock import utcnow
 from bson import ObjectId
-from datetime import datetime
 from typing import Optional
 import logging
 
@@ -169,7 +169,7 @@ async def request_payout(
             ifsc_code=payout_data.ifsc_code,
             bank_name=payout_data.bank_name,
             status=PayoutStatus.PENDING,
-            requested_at=datetime.utcnow()
+            requested_at=utcnow()
         )
         await payout_request.insert()
         
@@ -280,25 +280,34 @@ async def get_wallet_statistics(
             PayoutRequest.status == PayoutStatus.PENDING
         ).sum(PayoutRequest.amount) or 0
         
-        # Transaction analysis
-        transactions = await WalletTransaction.find(
-            WalletTransaction.wallet_id == wallet.id
-        ).to_list()
-        
-        referral_earnings = sum(
-            t.amount for t in transactions 
-            if t.transaction_type == TransactionType.CREDIT and t.referral_id
-        )
-        
-        total_txn_amount = sum(t.amount for t in transactions)
-        avg_txn_amount = total_txn_amount / len(transactions) if transactions else 0
-        
-        # Monthly earnings
-        monthly_earnings = {}
-        for txn in transactions:
-            if txn.transaction_type == TransactionType.CREDIT:
-                month = txn.created_at.strftime("%Y-%m")
-                monthly_earnings[month] = monthly_earnings.get(month, 0) + txn.amount
+        # Transaction analysis in one pass over the (wallet_id, created_at) index
+        earning_types = [TransactionType.CREDIT.value, TransactionType.REFERRAL_EARNING.value]
+        pipeline = [
+            {"$match": {"wallet_id": wallet.id}},
+            {"$facet": {
+                "totals": [
+                    {"$group": {"_id": None, "count": {"$sum": 1}, "amount": {"$sum": "$amount"}}}
+                ],
+                "referrals": [
+                    {"$match": {"transaction_type": {"$in": earning_types}, "referral_id": {"$ne": None}}},
+                    {"$group": {"_id": None, "amount": {"$sum": "$amount"}}}
+                ],
+                "monthly": [
+                    {"$match": {"transaction_type": {"$in": earning_types}}},
+                    {"$group": {
+                        "_id": {"$dateToString": {"format": "%Y-%m", "date": "$created_at"}},
+                        "earnings": {"$sum": "$amount"}
+                    }},
+                    {"$sort": {"_id": 1}}
+                ]
+            }}
+        ]
+        stats = (await WalletTransaction.get_motor_collection().aggregate(pipeline).to_list(length=1))[0]
+        
+        totals = stats["totals"][0] if stats["totals"] else {"count": 0, "amount": 0}
+        transaction_count = totals["count"]
+        referral_earnings = stats["referrals"][0]["amount"] if stats["referrals"] else 0
+        avg_txn_amount = totals["amount"] / transaction_count if transaction_count else 0
         
         # Earnings by type (e.g. from referrals)
         earnings_by_type = {
@@ -312,12 +321,11 @@ async def get_wallet_statistics(
             "total_withdrawn": wallet.total_withdrawn,
             "pending_payouts": pending_payouts,
             "referral_earnings": referral_earnings,
-            "transaction_count": len(transactions),
+            "transaction_count": transaction_count,
             "avg_txn_amount": round(avg_txn_amount, 2),
-            "monthly_earnings": sorted(
-                [{"month": k, "earnings": v} for k, v in monthly_earnings.items()],
-                key=lambda x: x['month']
-            ),
+            "monthly_earnings": [
+                {"month": row["_id"], "earnings": row["earnings"]} for row in stats["monthly"]
+            ],
             "earnings_by_type": earnings_by_type
         }
         
@@ -1,15 +1,26 @@
-from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Depends, BackgroundTasks, Response
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
-from app.models.workflow import N8NWorkflow, WorkflowExecution, WorkflowTemplate, AutomationRule, HEALTHCARE_WORKFLOW_TEMPLATES
+from app.models.workflow import (
+    N8NWorkflow, WorkflowCard, WorkflowNode, WorkflowExecution, ExecutionCard, ExecutionLogEntry, WorkflowTemplate, AutomationRule,
+    HEALTHCARE_WORKFLOW_TEMPLATES, HEALTHCARE_WORKFLOW_TEMPLATES_JSON, PREBUILT_TEMPLATE_NODES
+)
 from app.models.notification import Notification
 from app.services.ml_service import MLPredictor
 from app.middleware.auth import get_current_user, require_role
 from app.models.user import User
+from app.models.packed import unpack
+from app.utils.responses import ModelJSONResponse
+from app.utils.clock import utcnow
+from app.utils.ids import uuid7
+from app.services.insert_buffer import execution_log_buffer
+from app.services.model_cache import model_cache
 import uuid
 import json
 import asyncio
 from croniter import croniter
+from pydantic_core import to_json
+import orjson
 import logging
 
 logger = logging.getLogger(__name__)
@@ -19,7 +30,18 @@ router = APIRouter(prefix="/api/workflows", tags=["workflows", "n8n", "automatio
 # Initialize ML predictor
 ml_predictor = MLPredictor()
 
-@router.post("/create", dependencies=[Depends(require_role(["admin", "hospital"]))])
+# Built-in templates per category, pre-encoded; the full set is also the
+# response when no category is given
+_BUILT_IN_TEMPLATES_JSON = {
+    category: orjson.dumps({
+        template_id: template_data
+        for template_id, template_data in HEALTHCARE_WORKFLOW_TEMPLATES.items()
+        if template_data.get("category", "healthcare") == category
+    })
+    for category in {t.get("category", "healthcare") for t in HEALTHCARE_WORKFLOW_TEMPLATES.values()}
+}
+
+@router.post("/create", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def create_workflow(
     workflow_data: dict,
     current_user: User = Depends(get_current_user)
@@ -27,7 +49,7 @@ async def create_workflow(
     """Create a new n8n workflow"""
     try:
         workflow = N8NWorkflow(
-            workflow_id=str(uuid.uuid4()),
+            workflow_id=str(uuid7()),
             name=workflow_data["name"],
             description=workflow_data.get("description"),
             nodes=workflow_data.get("nodes", []),
@@ -60,11 +82,11 @@ async def get_workflow_templates(
 ):
     """Get available workflow templates"""
     try:
-        # Get built-in templates
-        templates = {}
-        for template_id, template_data in HEALTHCARE_WORKFLOW_TEMPLATES.items():
-            if not category or template_data.get("category", "healthcare") == category:
-                templates[template_id] = template_data
+        # Built-in templates are encoded once at import
+        if category:
+            templates = _BUILT_IN_TEMPLATES_JSON.get(category, b"{}")
+        else:
+            templates = HEALTHCARE_WORKFLOW_TEMPLATES_JSON
         
         # Get custom templates from database
         query = WorkflowTemplate.is_public == True
@@ -73,15 +95,17 @@ async def get_workflow_templates(
             
         custom_templates = await WorkflowTemplate.find(query).to_list()
         
-        return {
-            "built_in_templates": templates,
-            "custom_templates": custom_templates
-        }
+        body = (
+            b'{"built_in_templates":' + templates
+            + b',"custom_templates":' + to_json(custom_templates, by_alias=True, fallback=str)
+            + b'}'
+        )
+        return Response(body, media_type="application/json")
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/templates/{template_id}/instantiate", dependencies=[Depends(require_role(["admin", "hospital"]))])
+@router.post("/templates/{template_id}/instantiate", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def create_workflow_from_template(
     template_id: str,
     customization_data: dict,
@@ -108,12 +132,18 @@ async def create_workflow_from_template(
             **customization_data
         }
         
+        # Built-in template nodes are already validated unless overridden
+        if template_id in PREBUILT_TEMPLATE_NODES and "nodes" not in customization_data:
+            nodes = list(PREBUILT_TEMPLATE_NODES[template_id])
+        else:
+            nodes = workflow_data.get("nodes", [])
+        
         # Create workflow
         workflow = N8NWorkflow(
-            workflow_id=str(uuid.uuid4()),
+            workflow_id=str(uuid7()),
             name=workflow_data["name"],
             description=workflow_data.get("description"),
-            nodes=workflow_data.get("nodes", []),
+            nodes=nodes,
             connections=workflow_data.get("connections", {}),
             trigger={
                 "type": "manual",
@@ -159,7 +189,9 @@ async def list_workflows(
             # Patients can only see workflows that affect them
             query["category"] = "patient_care"
         
-        workflows = await N8NWorkflow.find(query).sort(-N8NWorkflow.created_at).to_list()
+        workflows = await N8NWorkflow.find(
+            query, projection_model=WorkflowCard
+        ).sort(-N8NWorkflow.created_at).to_list()
         
         return {"workflows": workflows}
         
@@ -175,9 +207,8 @@ async def execute_workflow(
 ):
     """Execute a workflow manually"""
     try:
-        workflow = await N8NWorkflow.find_one(
-            N8NWorkflow.workflow_id == workflow_id
-        )
+        # Definitions are read-mostly; the cached instance is never saved
+        workflow = await model_cache.get_by(N8NWorkflow, "workflow_id", workflow_id)
         
         if not workflow:
             raise HTTPException(status_code=404, detail="Workflow not found")
@@ -191,7 +222,7 @@ async def execute_workflow(
         
         # Create execution record
         execution = WorkflowExecution(
-            execution_id=str(uuid.uuid4()),
+            execution_id=str(uuid7()),
             workflow_id=workflow_id,
             workflow_name=workflow.name,
             trigger_data=execution_data.get("trigger_data", {}),
@@ -223,6 +254,39 @@ async def execute_workflow(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/executions")
+async def list_executions(
+    workflow_id: str,
+    status: Optional[str] = None,
+    limit: int = 50,
+    current_user: User = Depends(get_current_user)
+):
+    """List recent executions of a workflow"""
+    try:
+        workflow = await model_cache.get_by(N8NWorkflow, "workflow_id", workflow_id)
+        
+        if not workflow:
+            raise HTTPException(status_code=404, detail="Workflow not found")
+        
+        if current_user.role == "hospital" and workflow.hospital_id != (current_user.hospital_id or current_user.id):
+            raise HTTPException(status_code=403, detail="Access denied")
+        
+        query = {"workflow_id": workflow_id}
+        if status:
+            query["status"] = status
+        
+        # Payload fields are left out; see get_execution_status for details
+        executions = await WorkflowExecution.find(
+            query, projection_model=ExecutionCard
+        ).sort(-WorkflowExecution.started_at).limit(limit).to_list()
+        
+        return {"executions": executions}
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/executions/{execution_id}")
 async def get_execution_status(
     execution_id: str,
@@ -230,27 +294,40 @@ async def get_execution_status(
 ):
     """Get workflow execution status"""
     try:
-        execution = await WorkflowExecution.find_one(
-            WorkflowExecution.execution_id == execution_id
+        # Status is polled while a workflow runs; the stored document is
+        # returned as-is rather than re-validated with its logs and outputs
+        execution = await WorkflowExecution.get_motor_collection().find_one(
+            {"execution_id": execution_id}
         )
         
         if not execution:
             raise HTTPException(status_code=404, detail="Execution not found")
         
         # Check if user has access to this execution
-        workflow = await N8NWorkflow.find_one(
-            N8NWorkflow.workflow_id == execution.workflow_id
-        )
+        workflow = await model_cache.get_by(N8NWorkflow, "workflow_id", execution["workflow_id"])
         
         if workflow and current_user.role == "hospital" and workflow.hospital_id != (current_user.hospital_id or current_user.id):
             raise HTTPException(status_code=403, detail="Access denied")
         
-        return {"execution": execution}
+        execution["trigger_data"] = unpack(execution.get("trigger_data", {}))
+        execution["node_outputs"] = unpack(execution.get("node_outputs", {}))
+        
+        # Node results live in their own collection; executions stored
+        # before the move still carry them embedded
+        if not execution.get("execution_logs"):
+            execution["execution_logs"] = await ExecutionLogEntry.get_motor_collection().find(
+                {"execution_id": execution_id},
+                {"_id": 0, "execution_id": 0}
+            ).sort("seq", 1).to_list(length=None)
+        
+        return ModelJSONResponse({"execution": execution})
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/activate/{workflow_id}", dependencies=[Depends(require_role(["admin", "hospital"]))])
+@router.post("/activate/{workflow_id}", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def activate_workflow(
     workflow_id: str,
     current_user: User = Depends(get_current_user)
@@ -270,7 +347,7 @@ async def activate_workflow(
         
         workflow.status = "active"
         workflow.is_active = True
-        workflow.updated_at = datetime.utcnow()
+        workflow.updated_at = utcnow()
         await workflow.save()
         
         # Start scheduled workflows
@@ -285,7 +362,7 @@ async def activate_workflow(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/deactivate/{workflow_id}", dependencies=[Depends(require_role(["admin", "hospital"]))])
+@router.post("/deactivate/{workflow_id}", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def deactivate_workflow(
     workflow_id: str,
     current_user: User = Depends(get_current_user)
@@ -301,7 +378,7 @@ async def deactivate_workflow(
         
         workflow.status = "paused"
         workflow.is_active = False
-        workflow.updated_at = datetime.utcnow()
+        workflow.updated_at = utcnow()
         await workflow.save()
         
         return {
@@ -312,7 +389,7 @@ async def deactivate_workflow(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/automation-rules", dependencies=[Depends(require_role(["admin", "hospital"]))])
+@router.post("/automation-rules", dependencies=[Depends(require_role(("admin", "hospital")))])
 async def create_automation_rule(
     rule_data: dict,
     current_user: User = Depends(get_current_user)
@@ -439,7 +516,7 @@ async def trigger_ml_predictions(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@router.post("/train-models", dependencies=[Depends(require_role(["admin"]))])
+@router.post("/train-models", dependencies=[Depends(require_role(("admin",)))])
 async def train_ml_models(
     training_request: dict,
     background_tasks: BackgroundTasks,
@@ -460,7 +537,7 @@ async def train_ml_models(
         
         return {
             "message": f"ML model training started for: {model_type}",
-            "training_started_at": datetime.utcnow()
+            "training_started_at": utcnow()
         }
         
     except Exception as e:
@@ -468,13 +545,13 @@ async def train_ml_models(
 
 # Background task functions
 async def execute_workflow_nodes(workflow: N8NWorkflow, execution: WorkflowExecution, user_id: str):
-    """Execute workflow nodes sequentially"""
+    """Execute workflow nodes in dependency order"""
     try:
         execution.status = "running"
         await execution.save()
         
         # Execute nodes based on workflow logic
-        for node in workflow.nodes:
+        for seq, node in enumerate(workflow.ordered_nodes()):
             try:
                 execution.current_node = node.id
                 await execution.save()
@@ -483,22 +560,24 @@ async def execute_workflow_nodes(workflow: N8NWorkflow, execution: WorkflowExecu
                 execution.node_outputs[node.id] = node_output
                 execution.completed_nodes.append(node.id)
                 
-                # Add execution log
-                execution.execution_logs.append({
-                    "timestamp": datetime.utcnow(),
-                    "node_id": node.id,
-                    "status": "completed",
-                    "output": node_output
-                })
+                # Node results are logged through a batched insert
+                execution_log_buffer.add(ExecutionLogEntry(
+                    execution_id=execution.execution_id,
+                    seq=seq,
+                    node_id=node.id,
+                    status="completed",
+                    output=node_output
+                ))
                 
             except Exception as node_error:
                 execution.failed_nodes.append(node.id)
-                execution.execution_logs.append({
-                    "timestamp": datetime.utcnow(),
-                    "node_id": node.id,
-                    "status": "failed",
-                    "error": str(node_error)
-                })
+                execution_log_buffer.add(ExecutionLogEntry(
+                    execution_id=execution.execution_id,
+                    seq=seq,
+                    node_id=node.id,
+                    status="failed",
+                    error=str(node_error)
+                ))
                 
                 if workflow.error_handling == "stop":
                     execution.status = "failed"
@@ -509,32 +588,34 @@ async def execute_workflow_nodes(workflow: N8NWorkflow, execution: WorkflowExecu
         if execution.status == "running":
             execution.status = "success"
         
-        execution.completed_at = datetime.utcnow()
+        execution.completed_at = utcnow()
         execution.duration_seconds = (execution.completed_at - execution.started_at).total_seconds()
         
         await execution.save()
         
-        # Update workflow statistics
-        workflow.total_executions += 1
-        if execution.status == "success":
-            workflow.successful_executions += 1
-        else:
-            workflow.failed_executions += 1
-        
-        workflow.last_execution = execution.completed_at
-        await workflow.save()
+        # Update workflow statistics in place; the workflow may be a shared
+        # cached instance. Statistics don't affect execution, so the cache
+        # entry is left to expire rather than dropped on every run
+        outcome = "successful_executions" if execution.status == "success" else "failed_executions"
+        await N8NWorkflow.get_motor_collection().update_one(
+            {"_id": workflow.id},
+            {
+                "$inc": {"total_executions": 1, outcome: 1},
+                "$set": {"last_execution": execution.completed_at}
+            }
+        )
         
     except Exception as e:
         logger.error(f"Workflow execution error: {e}")
         execution.status = "failed"
         execution.error_message = str(e)
-        execution.completed_at = datetime.utcnow()
+        execution.completed_at = utcnow()
         await execution.save()
 
-async def execute_node(node: dict, execution: WorkflowExecution, workflow: N8NWorkflow) -> Dict[str, Any]:
+async def execute_node(node: WorkflowNode, execution: WorkflowExecution, workflow: N8NWorkflow) -> Dict[str, Any]:
     """Execute a single workflow node"""
-    node_type = node.get("type")
-    parameters = node.get("parameters", {})
+    node_type = node.type
+    parameters = node.parameters
     
     if node_type == "notification":
         return await execute_notification_node(parameters, execution)
@@ -649,7 +730,7 @@ async def schedule_workflow_execution(workflow: N8NWorkflow):
     """Schedule workflow execution based on cron expression"""
     try:
         if workflow.trigger.schedule:
-            cron = croniter(workflow.trigger.schedule, datetime.utcnow())
+            cron = croniter(workflow.trigger.schedule, utcnow())
             next_run = cron.get_next(datetime)
             
             logger.info(f"Workflow {workflow.workflow_id} scheduled for next execution at {next_run}")
@@ -1,4 +1,3 @@
-import google.generativeai as genai
 from app.config import settings
 from app.models.hospital import Hospital
 from app.models.surge_prediction import SurgePrediction
@@ -16,15 +15,25 @@ logger = logging.getLogger(__name__)
 class AIService:
     """Service for Gemini-powered predictions and recommendations"""
     
+    _UNSET = object()
+    
     def __init__(self):
-        # Configure Gemini
-        api_key = settings.gemini_api_key or settings.google_maps_api_key
-        if api_key:
-            genai.configure(api_key=api_key)
-            self.model = genai.GenerativeModel('gemini-1.5-flash')
-        else:
-            logger.warning("Gemini API key not configured. AI features will be disabled.")
-            self.model = None
+        # The Gemini client is created on first use, not at import time
+        self._model = self._UNSET
+    
+    @property
+    def model(self):
+        """Gemini model, configured lazily (None if no API key is set)"""
+        if self._model is self._UNSET:
+            api_key = settings.gemini_api_key or settings.google_maps_api_key
+            if api_key:
+                import google.generativeai as genai
+                genai.configure(api_key=api_key)
+                self._model = genai.GenerativeModel('gemini-1.5-flash')
+            else:
+                logger.warning("Gemini API key not configured. AI features will be disabled.")
+                self._model = None
+        return self._model
         
     def _rule_based_health_advice(self, message: str) -> str:
         text = (message or "").lower()
@@ -0,0 +1,70 @@
+"""
+Batched lookups for list endpoints.
+
+Each helper resolves the references of a whole result page with one $in
+query and returns a dict keyed by the reference, so handlers index into it
+instead of awaiting a lookup per row.
+"""
+from typing import Dict, Iterable, List
+
+from beanie import PydanticObjectId as ObjectId
+
+from app.models.hospital import Hospital
+from app.models.wallet import Wallet
+from app.services.model_cache import model_cache
+
+
+def _distinct(ids: Iterable) -> List:
+    """Unique, non-None ids in first-seen order"""
+    return list(dict.fromkeys(i for i in ids if i is not None))
+
+
+async def batch_fetch_by_id(document_class, ids: Iterable[ObjectId]) -> Dict[ObjectId, object]:
+    """
+    Fetch many documents of one class by id
+
+    Args:
+        document_class: Beanie document class
+        ids: Document ObjectIds, duplicates and None allowed
+
+    Returns:
+        Documents keyed by id; missing ids are absent
+    """
+    ids = _distinct(ids)
+    if not ids:
+        return {}
+    documents = await document_class.find({"_id": {"$in": ids}}).to_list()
+    return {document.id: document for document in documents}
+
+
+async def batch_fetch_hospital_names(hospital_ids: Iterable[ObjectId]) -> Dict[ObjectId, str]:
+    """
+    Fetch hospital names for many hospitals without loading the documents
+
+    Names are served from the shared model cache, which Hospital writes
+    invalidate; only uncached hospitals are queried, in one $in lookup.
+
+    Args:
+        hospital_ids: Hospital ObjectIds, duplicates and None allowed
+
+    Returns:
+        Names keyed by hospital id; missing hospitals are absent
+    """
+    return await model_cache.get_values(Hospital, "name", hospital_ids)
+
+
+async def batch_fetch_wallets_by_hospital(hospital_ids: Iterable[ObjectId]) -> Dict[ObjectId, Wallet]:
+    """
+    Fetch the wallets of many hospitals at once
+
+    Args:
+        hospital_ids: Hospital ObjectIds, duplicates and None allowed
+
+    Returns:
+        Wallets keyed by hospital_id; hospitals without a wallet are absent
+    """
+    ids = _distinct(hospital_ids)
+    if not ids:
+        return {}
+    wallets = await Wallet.find({"hospital_id": {"$in": ids}}).to_list()
+    return {wallet.hospital_id: wallet for wallet in wallets}
@@ -0,0 +1,132 @@
+from app.models.telemedicine import HealthData, HealthDataHourly
+from app.utils.clock import utcnow
+from datetime import datetime
+from beanie import PydanticObjectId as ObjectId
+from pymongo import UpdateOne
+from typing import Dict, List, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def hour_bucket(timestamp: datetime) -> datetime:
+    """Truncate a timestamp to the start of its hour"""
+    return timestamp.replace(minute=0, second=0, microsecond=0)
+
+
+class HealthRollupService:
+    """Service maintaining hourly vital sign aggregates next to raw HealthData"""
+    
+    @staticmethod
+    async def record(data_record: HealthData):
+        """
+        Fold the vital signs of a new HealthData record into hourly buckets
+        
+        Args:
+            data_record: HealthData that was just inserted
+        """
+        if not data_record.blocks:
+            return
+        
+        now = utcnow()
+        
+        # Combine samples per (parameter, hour) before writing; a batch may
+        # span an hour boundary, so each sample is bucketed by its own time
+        stats: Dict[tuple, dict] = {}
+        for block in data_record.blocks:
+            for value, timestamp in zip(block.values, block.timestamps):
+                key = (block.parameter, hour_bucket(timestamp))
+                entry = stats.get(key)
+                if entry is None:
+                    stats[key] = {
+                        "unit": block.unit,
+                        "min": value,
+                        "max": value,
+                        "sum": value,
+                        "count": 1
+                    }
+                else:
+                    entry["min"] = min(entry["min"], value)
+                    entry["max"] = max(entry["max"], value)
+                    entry["sum"] += value
+                    entry["count"] += 1
+        
+        if not stats:
+            return
+        
+        operations = [
+            UpdateOne(
+                {"patient_id": data_record.patient_id, "parameter": parameter, "hour_bucket": bucket},
+                {
+                    "$min": {"min": entry["min"]},
+                    "$max": {"max": entry["max"]},
+                    "$inc": {"sum": entry["sum"], "count": entry["count"]},
+                    "$set": {"unit": entry["unit"], "updated_at": now}
+                },
+                upsert=True
+            )
+            for (parameter, bucket), entry in stats.items()
+        ]
+        try:
+            await HealthDataHourly.get_motor_collection().bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to update hourly rollups for patient {data_record.patient_id}: {e}")
+    
+    @staticmethod
+    async def get_rollups(
+        patient_id: ObjectId,
+        start_date: datetime,
+        parameter: Optional[str] = None,
+        window_hours: int = 1
+    ) -> List[dict]:
+        """
+        Get aggregated vital signs for a patient
+        
+        Args:
+            patient_id: Patient ID
+            start_date: Earliest hour bucket to include
+            parameter: Optional VitalSign.type filter
+            window_hours: Bucket width in hours; hourly buckets are merged
+                into windows aligned to multiples of this many hours
+            
+        Returns:
+            Windows sorted newest first, each with
+            parameter, unit, window_start, min, max, mean and count
+        """
+        query = {"patient_id": patient_id, "hour_bucket": {"$gte": hour_bucket(start_date)}}
+        if parameter:
+            query["parameter"] = parameter
+        
+        hourly = await HealthDataHourly.find(query).sort(
+            -HealthDataHourly.hour_bucket
+        ).to_list()
+        
+        windows: Dict[tuple, dict] = {}
+        for row in hourly:
+            start = row.hour_bucket.replace(hour=row.hour_bucket.hour // window_hours * window_hours)
+            window = windows.get((row.parameter, start))
+            if window is None:
+                windows[(row.parameter, start)] = {
+                    "parameter": row.parameter,
+                    "unit": row.unit,
+                    "window_start": start,
+                    "min": row.min,
+                    "max": row.max,
+                    "sum": row.sum,
+                    "count": row.count
+                }
+            else:
+                window["min"] = min(window["min"], row.min)
+                window["max"] = max(window["max"], row.max)
+                window["sum"] += row.sum
+                window["count"] += row.count
+        
+        results = []
+        for window in windows.values():
+            window["mean"] = round(window.pop("sum") / window["count"], 2) if window["count"] else 0.0
+            results.append(window)
+        return results
+
+
+# Global health rollup service instance
+health_rollup_service = HealthRollupService()
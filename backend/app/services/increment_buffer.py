@@ -0,0 +1,73 @@
+from pymongo import UpdateOne
+from app.models.advertisement import Advertisement
+from collections import defaultdict
+from typing import Dict, Optional, Tuple
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IncrementBuffer:
+    """
+    Accumulates counter increments in memory and flushes them periodically
+    as a single bulk_write of $inc updates.
+    
+    Meant for hot paths such as ad impressions where exact real-time
+    counts are not needed; counts may lag by up to flush_interval seconds.
+    """
+    
+    def __init__(self, document_class, flush_interval: float = 5.0):
+        self.document_class = document_class
+        self.flush_interval = flush_interval
+        self._pending: Dict[Tuple, int] = defaultdict(int)
+        self._task: Optional[asyncio.Task] = None
+    
+    def add(self, doc_id, field: str, amount: int = 1):
+        """
+        Queue an increment of field on the document with doc_id
+        
+        Args:
+            doc_id: Document ObjectId
+            field: Dotted field path to increment
+            amount: Increment amount
+        """
+        self._pending[(doc_id, field)] += amount
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+    
+    async def flush(self):
+        """Write all pending increments in one bulk_write"""
+        if not self._pending:
+            return
+        
+        pending, self._pending = self._pending, defaultdict(int)
+        updates: Dict = defaultdict(dict)
+        for (doc_id, field), amount in pending.items():
+            updates[doc_id][field] = amount
+        
+        operations = [
+            UpdateOne({"_id": doc_id}, {"$inc": increments})
+            for doc_id, increments in updates.items()
+        ]
+        try:
+            await self.document_class.get_motor_collection().bulk_write(
+                operations, ordered=False
+            )
+        except Exception as e:
+            logger.error(f"Failed to flush {len(operations)} counter updates: {e}")
+    
+    async def _flush_loop(self):
+        while self._pending:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+    
+    async def stop(self):
+        """Cancel the flush loop and write out anything still pending"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+
+# Shared buffer for advertisement impression/click counters
+ad_metrics_buffer = IncrementBuffer(Advertisement)
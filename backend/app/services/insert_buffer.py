@@ -0,0 +1,72 @@
+from app.models.capacity_log import CapacityLog
+from app.models.workflow import ExecutionLogEntry
+from typing import List, Optional
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class InsertBuffer:
+    """
+    Collects documents in memory and writes them with one unordered
+    insert_many, either every flush_interval seconds or as soon as
+    max_batch documents are queued.
+
+    Meant for append-only logs where a short write delay is acceptable.
+    """
+
+    def __init__(self, document_class, flush_interval: float = 1.0, max_batch: int = 500):
+        self.document_class = document_class
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self._pending: List = []
+        self._task: Optional[asyncio.Task] = None
+        self._full = asyncio.Event()
+
+    def add(self, document):
+        """
+        Queue a document for insertion
+
+        Args:
+            document: Document instance of document_class
+        """
+        self._pending.append(document)
+        if len(self._pending) >= self.max_batch:
+            self._full.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def flush(self):
+        """Insert all pending documents in one insert_many"""
+        if not self._pending:
+            return
+
+        pending, self._pending = self._pending, []
+        self._full.clear()
+        try:
+            # Unordered so one bad document doesn't stop the rest of the batch
+            await self.document_class.insert_many(pending, ordered=False)
+        except Exception as e:
+            logger.error(f"Failed to insert {len(pending)} {self.document_class.__name__} documents: {e}")
+
+    async def _flush_loop(self):
+        while self._pending:
+            try:
+                await asyncio.wait_for(self._full.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    async def stop(self):
+        """Cancel the flush loop and write out anything still pending"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+        await self.flush()
+
+
+# Shared buffer for capacity change logs
+capacity_log_buffer = InsertBuffer(CapacityLog)
+
+# Shared buffer for workflow node results
+execution_log_buffer = InsertBuffer(ExecutionLogEntry)
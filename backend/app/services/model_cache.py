@@ -0,0 +1,123 @@
+from bson import ObjectId
+from cachetools import TTLCache
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class ModelCache:
+    """
+    Short-lived per-model cache of documents looked up by id.
+
+    Documents register invalidation through Beanie event hooks (see
+    Hospital.invalidate_cache), so writes made through the ODM are visible
+    immediately; writes that bypass it are picked up when the entry expires.
+
+    Cached instances are shared between requests and must be treated as
+    read-only. Load the document with Model.get() before modifying it.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: float = 60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._caches: Dict[type, TTLCache] = {}
+        self._field_caches: Dict[Tuple[type, str], TTLCache] = {}
+
+    def _cache_for(self, document_class) -> TTLCache:
+        cache = self._caches.get(document_class)
+        if cache is None:
+            cache = self._caches[document_class] = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+        return cache
+
+    async def get(self, document_class, doc_id) -> Optional[object]:
+        """
+        Get a document by id, loading it on a cache miss
+
+        Args:
+            document_class: Beanie document class
+            doc_id: Document ObjectId
+
+        Returns:
+            The cached document, or None if it doesn't exist
+        """
+        if doc_id is None:
+            return None
+        if isinstance(doc_id, str):
+            if not ObjectId.is_valid(doc_id):
+                return None
+            doc_id = ObjectId(doc_id)
+        cache = self._cache_for(document_class)
+        document = cache.get(doc_id)
+        if document is None:
+            document = await document_class.get(doc_id)
+            if document is not None:
+                cache[doc_id] = document
+        return document
+
+    async def get_by(self, document_class, field: str, value) -> Optional[object]:
+        """
+        Get a document by a unique field other than its id
+
+        The cache entry is keyed by value alone, so a document class should
+        be cached either by id or by a single unique field, not both.
+
+        Args:
+            document_class: Beanie document class
+            field: Name of the unique field to match
+            value: Field value
+
+        Returns:
+            The cached document, or None if it doesn't exist
+        """
+        if value is None:
+            return None
+        cache = self._cache_for(document_class)
+        document = cache.get(value)
+        if document is None:
+            document = await document_class.find_one({field: value})
+            if document is not None:
+                cache[value] = document
+        return document
+
+    async def get_values(self, document_class, field: str, ids: Iterable) -> Dict[ObjectId, object]:
+        """
+        Get one field of many documents, fetching all misses in one query
+
+        Only the field is cached, so listings that need e.g. hospital names
+        neither load nor keep whole documents.
+
+        Args:
+            document_class: Beanie document class
+            field: Top-level field name
+            ids: Document ObjectIds, duplicates and None allowed
+
+        Returns:
+            Field values keyed by id; missing documents are absent
+        """
+        key = (document_class, field)
+        cache = self._field_caches.get(key)
+        if cache is None:
+            cache = self._field_caches[key] = TTLCache(maxsize=self.maxsize, ttl=self.ttl)
+
+        values = {}
+        misses = []
+        for doc_id in dict.fromkeys(i for i in ids if i is not None):
+            if doc_id in cache:
+                values[doc_id] = cache[doc_id]
+            else:
+                misses.append(doc_id)
+
+        if misses:
+            cursor = document_class.get_motor_collection().find({"_id": {"$in": misses}}, {field: 1})
+            for doc in await cursor.to_list(length=None):
+                values[doc["_id"]] = cache[doc["_id"]] = doc.get(field)
+        return values
+
+    def invalidate(self, document_class, doc_id):
+        """Drop the cached entry for doc_id (or the get_by value), if any"""
+        self._cache_for(document_class).pop(doc_id, None)
+        for (cached_class, _), cache in self._field_caches.items():
+            if cached_class is document_class:
+                cache.pop(doc_id, None)
+
+
+# Shared cache for read-mostly lookups such as hospital names in listings
+model_cache = ModelCache()
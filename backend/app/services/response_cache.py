@@ -0,0 +1,46 @@
+import hashlib
+from cachetools import TTLCache
+from pydantic_core import to_json
+from typing import Any, Hashable, Optional, Tuple
+
+
+class ResponseCache:
+    """
+    Short-lived cache of encoded JSON response bodies and their ETags.
+
+    Entries are keyed by (namespace, *params) tuples. Models drop a whole
+    namespace from their Beanie event hooks (see Hospital.invalidate_cache),
+    so ODM writes show up immediately; other writes appear once the entry
+    expires.
+    """
+
+    def __init__(self, maxsize: int = 256, ttl: float = 60):
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def get(self, key: Tuple[Hashable, ...]) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, etag) for key, or None"""
+        return self._cache.get(key)
+
+    def put(self, key: Tuple[Hashable, ...], content: Any) -> Tuple[bytes, str]:
+        """
+        Encode content and cache it under key
+
+        Args:
+            key: Tuple whose first item is the namespace
+            content: Response content, encoded like ModelJSONResponse
+
+        Returns:
+            (body, etag)
+        """
+        body = to_json(content, by_alias=True, fallback=str)
+        entry = self._cache[key] = (body, '"' + hashlib.md5(body).hexdigest() + '"')
+        return entry
+
+    def invalidate(self, namespace: str):
+        """Drop every entry whose key starts with namespace"""
+        for key in [key for key in list(self._cache.keys()) if key[0] == namespace]:
+            self._cache.pop(key, None)
+
+
+# Shared cache for read-heavy admin listings
+response_cache = ResponseCache()
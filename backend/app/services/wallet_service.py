@@ -1,7 +1,7 @@
 from app.models.wallet import Wallet, WalletTransaction, TransactionType
 from app.models.referral import Referral
 from bson import ObjectId
-from typing import Optional
+from typing import List, Optional
 import logging
 
 logger = logging.getLogger(__name__)
@@ -67,6 +67,39 @@ class WalletService:
         logger.info(f"Credited ₹{amount} to wallet {wallet.id}")
         return transaction
     
+    @staticmethod
+    async def credit_wallets(credits: List[dict]) -> List[WalletTransaction]:
+        """
+        Credit several hospital wallets and log all transactions in one write
+        
+        Args:
+            credits: Dicts with hospital_id, amount, transaction_type,
+                description and an optional referral_id string, as for
+                credit_wallet
+            
+        Returns:
+            WalletTransaction objects, in the order of credits
+        """
+        transactions = []
+        for credit in credits:
+            wallet = await WalletService.get_or_create_wallet(credit["hospital_id"])
+            await wallet.credit(credit["amount"])
+            referral_id = credit.get("referral_id")
+            transactions.append(WalletTransaction(
+                wallet_id=wallet.id,
+                referral_id=ObjectId(referral_id) if referral_id else None,
+                transaction_type=credit["transaction_type"],
+                amount=credit["amount"],
+                description=credit["description"]
+            ))
+        
+        if transactions:
+            await WalletTransaction.insert_many(transactions, ordered=False)
+        
+        for transaction in transactions:
+            logger.info(f"Credited ₹{transaction.amount} to wallet {transaction.wallet_id}")
+        return transactions
+    
     @staticmethod
     async def debit_wallet(
         hospital_id: ObjectId,
@@ -116,21 +149,22 @@ class WalletService:
             from_hospital_share: Share for referring hospital
             to_hospital_share: Share for accepting hospital
         """
-        # Credit from_hospital
-        await WalletService.credit_wallet(
-            hospital_id=referral.from_hospital_id,
-            amount=from_hospital_share,
-            description=f"Referral payment - referring hospital (Referral #{referral.id})",
-            referral_id=referral.id
-        )
-        
-        # Credit to_hospital
-        await WalletService.credit_wallet(
-            hospital_id=referral.to_hospital_id,
-            amount=to_hospital_share,
-            description=f"Referral payment - accepting hospital (Referral #{referral.id})",
-            referral_id=referral.id
-        )
+        await WalletService.credit_wallets([
+            {
+                "hospital_id": referral.from_hospital_id,
+                "amount": from_hospital_share,
+                "transaction_type": TransactionType.REFERRAL_EARNING,
+                "description": f"Referral payment - referring hospital (Referral #{referral.id})",
+                "referral_id": str(referral.id)
+            },
+            {
+                "hospital_id": referral.to_hospital_id,
+                "amount": to_hospital_share,
+                "transaction_type": TransactionType.REFERRAL_EARNING,
+                "description": f"Referral payment - accepting hospital (Referral #{referral.id})",
+                "referral_id": str(referral.id)
+            }
+        ])
         
         logger.info(
             f"Processed referral payment: From Hospital ₹{from_hospital_share}, "
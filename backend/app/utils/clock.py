@@ -0,0 +1,39 @@
+"""
+Shared "now" for document timestamps.
+
+Models use utcnow() as their created_at/updated_at default factory. Inside a
+request (see app.middleware.clock) or a frozen_now() block it returns one
+timestamp fixed at the start, so documents created together get identical
+timestamps and bulk construction doesn't read the clock per field.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Optional
+
+_NOW: ContextVar[Optional[datetime]] = ContextVar("_now", default=None)
+
+
+def utcnow() -> datetime:
+    """Current frozen timestamp, or datetime.utcnow() outside of one"""
+    return _NOW.get() or datetime.utcnow()
+
+
+def freeze_now() -> None:
+    """Fix utcnow() for the rest of the current context"""
+    _NOW.set(datetime.utcnow())
+
+
+def unfreeze_now() -> None:
+    """Make utcnow() read the clock again in the current context"""
+    _NOW.set(None)
+
+
+@contextmanager
+def frozen_now():
+    """Fix utcnow() for the duration of the block, e.g. around seed loops"""
+    token = _NOW.set(datetime.utcnow())
+    try:
+        yield
+    finally:
+        _NOW.reset(token)
@@ -0,0 +1,20 @@
+"""
+Time-ordered identifiers.
+
+uuid7() follows RFC 9562: a 48-bit Unix millisecond timestamp followed by
+random bits. Ids generated later sort after earlier ones, so unique indexes
+on them grow at the right edge instead of splitting pages at random.
+"""
+import os
+import time
+import uuid
+
+
+def uuid7() -> uuid.UUID:
+    """Version 7 UUID for the current time"""
+    value = (time.time_ns() // 1_000_000) << 80
+    value |= int.from_bytes(os.urandom(10), "big")
+    # Version (0111) and RFC 4122 variant (10) bits
+    value = (value & ~(0xF << 76)) | (0x7 << 76)
+    value = (value & ~(0x3 << 62)) | (0x2 << 62)
+    return uuid.UUID(int=value)
@@ -2,6 +2,26 @@ from jose import JWTError, jwt
 from datetime import datetime, timedelta
 from app.config import settings
 from typing import Optional, Dict
+from cachetools import TTLCache
+import hashlib
+import hmac
+import time
+
+
+# Recently verified tokens -> payload, keyed by a short token digest, so
+# repeat requests with the same token skip signature verification
+_JWT_CACHE: TTLCache = TTLCache(maxsize=20_000, ttl=60)
+
+
+# Demo-mode tokens skip JWT decoding: a fixed prefix plus an HMAC of the
+# demo user id, so they still can't be forged without the secret key
+DEMO_TOKEN_PREFIX = "demo."
+DEMO_USER_ID = "demo-user-id"
+_DEMO_TOKEN = DEMO_TOKEN_PREFIX + hmac.new(
+    settings.jwt_secret_key.encode(),
+    DEMO_USER_ID.encode(),
+    hashlib.sha256
+).hexdigest()
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
@@ -41,15 +61,26 @@ def decode_access_token(token: str) -> Optional[Dict]:
     Returns:
         Decoded token payload or None if invalid
     """
+    key = hashlib.blake2b(token.encode(), digest_size=16).digest()
+    payload = _JWT_CACHE.get(key)
+    if payload is not None:
+        # The cache TTL may outlive the token itself
+        if payload.get("exp", float("inf")) > time.time():
+            return payload
+        _JWT_CACHE.pop(key, None)
+        return None
+    
     try:
         payload = jwt.decode(
             token,
             settings.jwt_secret_key,
             algorithms=[settings.jwt_algorithm]
         )
-        return payload
     except JWTError:
         return None
+    
+    _JWT_CACHE[key] = payload
+    return payload
 
 
 def verify_token(token: str) -> bool:
@@ -64,3 +95,13 @@ def verify_token(token: str) -> bool:
     """
     payload = decode_access_token(token)
     return payload is not None
+
+
+def create_demo_token() -> str:
+    """Return the access token used for demo-mode logins"""
+    return _DEMO_TOKEN
+
+
+def is_demo_token(token: str) -> bool:
+    """Check a demo-prefixed token in constant time"""
+    return hmac.compare_digest(token, _DEMO_TOKEN)
@@ -1,5 +1,7 @@
 import urllib.parse
 import logging
+import dns.asyncresolver
+import dns.resolver
 
 logger = logging.getLogger(__name__)
 
@@ -44,3 +46,52 @@ def get_direct_connection_url(original_url: str) -> str:
     except Exception as e:
         logger.error(f"Error constructing direct MongoDB URL: {e}")
         return None
+
+
+async def resolve_srv_url(original_url: str) -> str:
+    """
+    Expand a mongodb+srv:// URL into a plain mongodb:// seed list.
+    
+    The SRV and TXT lookups run on the asyncio resolver, so the driver does
+    not block the event loop on DNS while constructing the client.
+    Returns the original URL unchanged if it is not an SRV URL or the
+    lookup fails.
+    """
+    if not original_url.startswith("mongodb+srv://"):
+        return original_url
+    
+    try:
+        parsed = urllib.parse.urlparse(original_url)
+        host = parsed.hostname
+        resolver = dns.asyncresolver.Resolver()
+        
+        srv_records = await resolver.resolve(f"_mongodb._tcp.{host}", "SRV")
+        hosts = [
+            f"{str(record.target).rstrip('.')}:{record.port}"
+            for record in srv_records
+        ]
+        
+        # TXT record carries default options such as replicaSet/authSource
+        options = {"tls": "true"}
+        try:
+            txt_records = await resolver.resolve(host, "TXT")
+            for record in txt_records:
+                txt = b"".join(record.strings).decode()
+                options.update(urllib.parse.parse_qsl(txt))
+        except dns.resolver.NoAnswer:
+            pass
+        
+        # Options given explicitly in the URL win over DNS defaults
+        options.update(urllib.parse.parse_qsl(parsed.query))
+        
+        userinfo = parsed.netloc.rpartition("@")[0]
+        netloc = f"{userinfo}@{','.join(hosts)}" if userinfo else ",".join(hosts)
+        
+        return urllib.parse.urlunparse((
+            "mongodb", netloc, parsed.path, "",
+            urllib.parse.urlencode(options), ""
+        ))
+    
+    except Exception as e:
+        logger.warning(f"SRV pre-resolution failed, using original URL: {e}")
+        return original_url
@@ -0,0 +1,40 @@
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic_core import to_json
+from typing import Any, Optional
+
+
+class ModelJSONResponse(Response):
+    """
+    JSON response serialized by pydantic-core.
+
+    Content may contain Beanie documents, Pydantic models, datetimes and
+    ObjectIds; they are encoded in one pass without FastAPI's
+    jsonable_encoder. Return it directly from a route to skip that pass.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        # by_alias matches jsonable_encoder; bare bson ObjectIds fall back to str
+        return to_json(content, by_alias=True, fallback=str)
+
+
+def etag_response(request: Request, body: bytes, etag: str, cache_control: Optional[str] = None) -> Response:
+    """
+    Return a pre-encoded JSON body, or 304 if the client already has it
+
+    Args:
+        request: Incoming request, checked for If-None-Match
+        body: Encoded JSON body
+        etag: Quoted ETag of body
+        cache_control: Optional Cache-Control header value
+
+    Returns:
+        200 response with the body, or an empty 304
+    """
+    headers = {"ETag": etag}
+    if cache_control:
+        headers["Cache-Control"] = cache_control
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
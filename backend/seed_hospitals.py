@@ -2,6 +2,7 @@ import asyncio
 import os
 from app.database import connect_to_mongo
 from app.models.hospital import Hospital
+from app.utils.clock import freeze_now
 from app.config import settings
 
 # Dummy hospitals in Mumbai
@@ -143,6 +144,8 @@ async def seed_data():
     await connect_to_mongo()
     
     print("Seeding hospitals...")
+    # All seeded hospitals share one created_at/updated_at
+    freeze_now()
     count = 0
     for h_data in HOSPITALS:
         # Check if exists
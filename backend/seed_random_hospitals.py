@@ -2,6 +2,7 @@ import asyncio
 import random
 from app.database import connect_to_mongo
 from app.models.hospital import Hospital
+from app.utils.clock import freeze_now
 from faker import Faker
 
 fake = Faker('en_IN')
@@ -35,6 +36,8 @@ async def seed_random_hospitals():
     await connect_to_mongo()
     
     print("Seeding random hospitals...")
+    # All seeded hospitals share one created_at/updated_at
+    freeze_now()
     for loc in MUMBAI_LOCATIONS:
         # Generate random offset for coordinates to avoid stacking
         lat = loc["lat"] + random.uniform(-0.01, 0.01)
@@ -0,0 +1,42 @@
+import pytest
+from pydantic import BaseModel
+
+from app.models.delimited import DELIMITED_BSON_ENCODERS, DELIMITER, DelimitedList
+
+
+class Note(BaseModel):
+    items: DelimitedList = []
+
+
+def round_trip(items):
+    value = Note(items=items).items
+    stored = DELIMITED_BSON_ENCODERS[type(value)](value)
+    return stored, Note(items=stored).items
+
+
+@pytest.mark.parametrize("items", [
+    [],
+    [""],
+    ["", ""],
+    ["", "a"],
+    ["a", ""],
+    ["a"],
+    ["a", "b c"],
+    [f"a{DELIMITER}b"],
+    ["a", f"{DELIMITER}b", ""],
+])
+def test_round_trip(items):
+    _, loaded = round_trip(items)
+    assert loaded == items
+
+
+def test_joinable_list_is_stored_as_string():
+    stored, _ = round_trip(["a", "b"])
+    assert stored == f"a{DELIMITER}b"
+
+
+@pytest.mark.parametrize("items", [[""], [f"a{DELIMITER}b"]])
+def test_lossy_list_is_stored_as_array(items):
+    stored, _ = round_trip(items)
+    assert stored == items
+    assert type(stored) is list